@@ -0,0 +1,50 @@
+"""add room_participants.last_seen_at and the stale-participant index
+
+Revision ID: 0b6e9d2f4a71
+Revises: f2c8e6a41b93
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e9d2f4a71'
+down_revision: Union[str, Sequence[str], None] = 'f2c8e6a41b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if "room_participants" not in set(inspect(bind).get_table_names()):
+        # Table not created yet; Base.metadata.create_all builds it with the column and index
+        return
+    columns = {c["name"] for c in inspect(bind).get_columns("room_participants")}
+    if "last_seen_at" not in columns:
+        op.add_column("room_participants", sa.Column("last_seen_at", sa.DateTime(), nullable=True))
+
+    if bind.dialect.name == "postgresql":
+        # CONCURRENTLY cannot run inside a transaction; avoids locking participant writes
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_room_participant_last_seen "
+                "ON room_participants (last_seen_at) WHERE left_at IS NULL"
+            )
+    else:
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_room_participant_last_seen "
+            "ON room_participants (last_seen_at) WHERE left_at IS NULL"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_room_participant_last_seen")
+    if "room_participants" in set(inspect(op.get_bind()).get_table_names()):
+        op.drop_column("room_participants", "last_seen_at")
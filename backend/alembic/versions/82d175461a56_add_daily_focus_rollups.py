@@ -0,0 +1,73 @@
+"""add daily_focus_rollups table
+
+Revision ID: 82d175461a56
+Revises: de25937a4cf7
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '82d175461a56'
+down_revision: Union[str, Sequence[str], None] = 'de25937a4cf7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "daily_focus_rollups" not in set(inspector.get_table_names()):
+        op.create_table(
+            "daily_focus_rollups",
+            sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("focus_seconds", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("break_seconds", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("session_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.PrimaryKeyConstraint("user_id", "date", name="daily_focus_rollups_pkey"),
+        )
+
+    if bind.dialect.name == "postgresql":
+        # Backfill from completed sessions using the same duration rule as
+        # timetrackerservice._effective_duration_seconds
+        op.execute("""
+            INSERT INTO daily_focus_rollups (user_id, date, focus_seconds, break_seconds, session_count)
+            SELECT
+                user_id,
+                CAST(start_time AS DATE),
+                SUM(CASE WHEN type = 'focus' THEN duration ELSE 0 END),
+                SUM(CASE WHEN type = 'break' THEN duration ELSE 0 END),
+                SUM(CASE WHEN type = 'focus' THEN 1 ELSE 0 END)
+            FROM (
+                SELECT
+                    user_id,
+                    start_time,
+                    type,
+                    CASE
+                        WHEN type = 'focus'
+                             AND COALESCE(planned_duration, 0) <> 0
+                             AND ABS(FLOOR(EXTRACT(EPOCH FROM (end_time - start_time)) / 60) - planned_duration) <= 1
+                        THEN planned_duration * 60
+                        ELSE FLOOR(EXTRACT(EPOCH FROM (end_time - start_time)))
+                    END AS duration
+                FROM time_sessions
+                WHERE end_time IS NOT NULL
+                  AND start_time IS NOT NULL
+                  AND type IN ('focus', 'break')
+            ) completed
+            GROUP BY user_id, CAST(start_time AS DATE)
+            ON CONFLICT (user_id, date) DO NOTHING
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_focus_rollups")
@@ -0,0 +1,50 @@
+"""add composite and open-session indexes on time_sessions
+
+Revision ID: b7e41c09d2a3
+Revises: 82d175461a56
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e41c09d2a3'
+down_revision: Union[str, Sequence[str], None] = '82d175461a56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # CONCURRENTLY cannot run inside a transaction; avoids locking time_sessions writes
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_time_sessions_user_start "
+                "ON time_sessions (user_id, start_time)"
+            )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_time_sessions_open "
+                "ON time_sessions (user_id, type, start_time) WHERE end_time IS NULL"
+            )
+    elif bind.dialect.name == "sqlite":
+        op.execute("CREATE INDEX IF NOT EXISTS idx_time_sessions_user_start ON time_sessions (user_id, start_time)")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_time_sessions_open "
+            "ON time_sessions (user_id, type, start_time) WHERE end_time IS NULL"
+        )
+    else:
+        # No partial index support assumed; a full composite index still serves the lookups
+        op.create_index("idx_time_sessions_user_start", "time_sessions", ["user_id", "start_time"])
+        op.create_index("idx_time_sessions_open", "time_sessions", ["user_id", "type", "start_time"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_time_sessions_open")
+    op.execute("DROP INDEX IF EXISTS idx_time_sessions_user_start")
@@ -0,0 +1,55 @@
+"""add leaderboard index on user_challenge_stats.total_points
+
+Revision ID: c3d9a5e17f40
+Revises: b7e41c09d2a3
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9a5e17f40'
+down_revision: Union[str, Sequence[str], None] = 'b7e41c09d2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if "user_challenge_stats" not in set(inspect(bind).get_table_names()):
+        # Table not created yet; Base.metadata.create_all builds it with the index
+        return
+    # Keyset pagination compares total_points; NULLs would sort unpredictably
+    op.execute("UPDATE user_challenge_stats SET total_points = 0 WHERE total_points IS NULL")
+    if bind.dialect.name == "postgresql":
+        op.alter_column(
+            "user_challenge_stats", "total_points",
+            existing_type=sa.Integer(), nullable=False, server_default=sa.text("0"),
+        )
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_challenge_stats_points "
+                "ON user_challenge_stats (total_points DESC, user_id)"
+            )
+    else:
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_user_challenge_stats_points "
+            "ON user_challenge_stats (total_points DESC, user_id)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_user_challenge_stats_points")
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and "user_challenge_stats" in set(inspect(bind).get_table_names()):
+        op.alter_column(
+            "user_challenge_stats", "total_points",
+            existing_type=sa.Integer(), nullable=True, server_default=None,
+        )
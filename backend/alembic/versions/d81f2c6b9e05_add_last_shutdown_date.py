@@ -0,0 +1,64 @@
+"""add user_challenge_stats.last_shutdown_date and backfill shutdown streaks
+
+Revision ID: d81f2c6b9e05
+Revises: c3d9a5e17f40
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f2c6b9e05'
+down_revision: Union[str, Sequence[str], None] = 'c3d9a5e17f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if "user_challenge_stats" not in set(inspect(bind).get_table_names()):
+        # Table not created yet; Base.metadata.create_all builds it with the column
+        return
+    columns = {c["name"] for c in inspect(bind).get_columns("user_challenge_stats")}
+    if "last_shutdown_date" not in columns:
+        op.add_column("user_challenge_stats", sa.Column("last_shutdown_date", sa.Date(), nullable=True))
+
+    if bind.dialect.name == "postgresql":
+        # Gaps-and-islands: consecutive days share (day - row_number); keep each user's latest island
+        op.execute("""
+            WITH days AS (
+                SELECT DISTINCT user_id, CAST(shutdown_date AS DATE) AS day
+                FROM shutdown_reflections
+            ),
+            islands AS (
+                SELECT user_id, day,
+                       day - CAST(ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day) AS INTEGER) AS island
+                FROM days
+            ),
+            streaks AS (
+                SELECT user_id, COUNT(*) AS streak, MAX(day) AS last_day,
+                       ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY MAX(day) DESC) AS recency
+                FROM islands
+                GROUP BY user_id, island
+            )
+            INSERT INTO user_challenge_stats
+                (user_id, total_points, challenges_completed, weekly_points, current_shutdown_streak, last_shutdown_date)
+            SELECT user_id, 0, 0, 0, streak, last_day
+            FROM streaks
+            WHERE recency = 1
+            ON CONFLICT (user_id) DO UPDATE
+            SET current_shutdown_streak = EXCLUDED.current_shutdown_streak,
+                last_shutdown_date = EXCLUDED.last_shutdown_date
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if "user_challenge_stats" in set(inspect(op.get_bind()).get_table_names()):
+        op.drop_column("user_challenge_stats", "last_shutdown_date")
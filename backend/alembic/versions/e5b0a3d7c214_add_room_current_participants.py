@@ -0,0 +1,52 @@
+"""add coworking_rooms.current_participants counter
+
+Revision ID: e5b0a3d7c214
+Revises: d81f2c6b9e05
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b0a3d7c214'
+down_revision: Union[str, Sequence[str], None] = 'd81f2c6b9e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    tables = set(inspect(bind).get_table_names())
+    if "coworking_rooms" not in tables:
+        # Table not created yet; Base.metadata.create_all builds it with the column
+        return
+    columns = {c["name"] for c in inspect(bind).get_columns("coworking_rooms")}
+    if "current_participants" not in columns:
+        op.add_column(
+            "coworking_rooms",
+            sa.Column("current_participants", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+    if "room_participants" in tables:
+        # Seed the counter from the participants who have not left
+        op.execute("""
+            UPDATE coworking_rooms
+            SET current_participants = (
+                SELECT COUNT(*)
+                FROM room_participants
+                WHERE room_participants.room_id = coworking_rooms.id
+                  AND room_participants.left_at IS NULL
+            )
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if "coworking_rooms" in set(inspect(op.get_bind()).get_table_names()):
+        op.drop_column("coworking_rooms", "current_participants")
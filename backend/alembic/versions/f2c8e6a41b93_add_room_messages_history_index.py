@@ -0,0 +1,44 @@
+"""add (room_id, created_at DESC, id DESC) index on room_messages
+
+Revision ID: f2c8e6a41b93
+Revises: e5b0a3d7c214
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8e6a41b93'
+down_revision: Union[str, Sequence[str], None] = 'e5b0a3d7c214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if "room_messages" not in set(inspect(bind).get_table_names()):
+        # Table not created yet; Base.metadata.create_all builds it with the index
+        return
+    if bind.dialect.name == "postgresql":
+        # CONCURRENTLY cannot run inside a transaction; avoids locking room_messages writes
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_room_message_room_created "
+                "ON room_messages (room_id, created_at DESC, id DESC)"
+            )
+    else:
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_room_message_room_created "
+            "ON room_messages (room_id, created_at DESC, id DESC)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_room_message_room_created")
@@ -6,6 +6,7 @@ from app.models.user import User
 from app.models.user_settings import UserSettings
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.user_cache import user_cache
 from app.core.security import create_access_token, hash_password, verify_password
 from typing import Union
 import uuid
@@ -258,6 +259,7 @@ def update_user_profile(
 
         try:
             db.commit()
+            user_cache.invalidate(current_user.id)
             db.refresh(current_user)
             logger.info(f"User profile updated successfully. Avatar_url: {current_user.avatar_url}")
         except Exception as e:
@@ -455,6 +457,7 @@ def change_email_address(
         current_user.is_verified = True  # Mark email as verified
         
         db.commit()
+        user_cache.invalidate(current_user.id)
         db.refresh(current_user)
         
         logger.info(f"Email successfully changed to {payload.new_email} for user {current_user.id}")
@@ -546,6 +549,7 @@ async def complete_onboarding(
             user_settings.focus_goal = onboarding_data.focus_goal
         
         db.commit()
+        user_cache.invalidate(current_user.id)
         db.refresh(current_user)
         
         # Return updated user data
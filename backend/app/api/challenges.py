@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.schemas.challenge import UserChallengeStats, WeeklyChallenge, LeaderboardUser
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user_cached
+from app.core.user_cache import CachedUser
 from app.core.database import get_db
-from app.models.user import User
 from app.services import challengeservice
 
 router = APIRouter(prefix="/challenges", tags=["Challenges"])
@@ -14,29 +14,45 @@ router = APIRouter(prefix="/challenges", tags=["Challenges"])
 @router.get("/stats", response_model=UserChallengeStats)
 def get_user_stats(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     return challengeservice.get_user_stats(db, current_user.id)
 
 @router.get("/week", response_model=List[WeeklyChallenge])
 def get_weekly_challenges(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     return challengeservice.get_weekly_challenges(db, current_user.id)
 
 @router.get("/leaders", response_model=List[LeaderboardUser])
 def get_leaderboard(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(challengeservice.LEADERBOARD_TOP_N, ge=1, le=challengeservice.LEADERBOARD_MAX_LIMIT),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
-    return challengeservice.get_leaderboard(db, current_user.id)
+    """Leaderboard page; pass the X-Next-Cursor response header back as `cursor` for the next page"""
+    leaders, next_cursor = challengeservice.get_leaderboard(db, current_user.id, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return leaders
+
+@router.get("/leaders/around-me", response_model=List[LeaderboardUser])
+def get_leaderboard_around_me(
+    window: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_user_cached)
+):
+    """The current user's row with `window` neighbours above and below"""
+    return challengeservice.get_leaderboard_around_user(db, current_user.id, window)
 
 @router.post("/{challenge_id}/join")
 def join_challenge(
     challenge_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     return challengeservice.join_challenge(db, challenge_id, current_user.id)
 
@@ -44,7 +60,7 @@ def join_challenge(
 def leave_challenge(
     challenge_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     challengeservice.leave_challenge(db, challenge_id, current_user.id)
     return {"message": "Successfully left challenge"}
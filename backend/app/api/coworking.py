@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.schemas.room import (
@@ -16,13 +17,15 @@ from app.schemas.room import (
     SpeakingStatusRequest,
     EmojiReactionRequest
 )
-from app.core.auth import get_current_user
-from app.core.database import get_db
-from app.models.user import User
+from app.core.auth import get_current_user_cached
+from app.core.user_cache import CachedUser
+from app.core.database import get_db, get_async_db
 from app.models.room import CoworkingRoom
 from app.models.coworking import RoomParticipant, RoomMessage
 # from app.models.room_message import RoomMessage
 from app.services import coworkingservice
+from app.services.room_message_buffer import room_message_buffer
+from app.services.websocket_manager import websocket_manager
 
 
 router = APIRouter(prefix="/coworking", tags=["Coworking"])
@@ -32,7 +35,7 @@ router = APIRouter(prefix="/coworking", tags=["Coworking"])
 def create_room(
     room_data: CoworkingRoomCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """
     Create a new coworking room.
@@ -52,6 +55,7 @@ def create_room(
 
     db.add(new_room)
     db.commit()
+    coworkingservice.invalidate_room_list()
     db.refresh(new_room)
 
     return CoworkingRoomSummary(
@@ -66,32 +70,50 @@ def create_room(
 
 
 @router.get("/rooms", response_model=List[CoworkingRoomSummary])
-def list_rooms(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def list_rooms(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Get all available coworking rooms"""
-    return coworkingservice.get_all_rooms(db)
+    return await coworkingservice.get_all_rooms_async(db)
 
 
 @router.get("/rooms/{room_id}", response_model=CoworkingRoomDetail)
-def get_room(
+async def get_room(
     room_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Get specific room details"""
-    room = coworkingservice.get_room_details(db, room_id)
+    room = await coworkingservice.get_room_details_async(db, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     return room
 
 
+@router.get("/rooms/{room_id}/messages", response_model=List[RoomMessageResponse])
+async def get_room_messages(
+    room_id: UUID,
+    response: Response,
+    before: Optional[UUID] = None,
+    limit: int = Query(
+        coworkingservice.ROOM_MESSAGES_DEFAULT_LIMIT, ge=1, le=coworkingservice.ROOM_MESSAGES_MAX_LIMIT
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_user_cached)
+):
+    """Room message history, oldest first; pass the X-Next-Cursor response header back as `before` for older messages"""
+    messages, next_cursor = await coworkingservice.get_room_messages_async(db, room_id, before, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return messages
+
+
 @router.post("/rooms/{room_id}/join", response_model=JoinRoomResponse)
 def join_room(
     room_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Join a coworking room"""
     user_id = current_user.id
@@ -112,8 +134,9 @@ def join_room(
 @router.post("/rooms/{room_id}/leave", response_model=LeaveRoomResponse)
 def leave_room(
     room_id: UUID,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Leave a coworking room"""
     user_id = current_user.id
@@ -124,6 +147,10 @@ def leave_room(
             raise HTTPException(status_code=400, detail="Invalid user ID")
 
     coworkingservice.leave_room(db, room_id, user_id)
+    # Other workers drop the user's presence; sockets in the room see them go
+    background_tasks.add_task(
+        websocket_manager.publish_room_event, str(room_id), "user-left", {"userId": str(user_id)}, str(user_id)
+    )
     return LeaveRoomResponse(
         success=True,
         message="Left room successfully"
@@ -134,8 +161,9 @@ def leave_room(
 def send_message(
     room_id: UUID,
     request: SendMessageRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Send a message to the room"""
     user_id = current_user.id
@@ -145,17 +173,24 @@ def send_message(
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid user ID")
 
-    return coworkingservice.send_message(
+    message = coworkingservice.send_message(
         db, room_id, user_id, request.message_text, request.message_type
     )
+    # Published after the response, i.e. after the message is committed
+    background_tasks.add_task(
+        websocket_manager.publish_room_event,
+        str(room_id), "chat-message", message.model_dump(mode="json"), str(user_id)
+    )
+    return message
 
 
 @router.put("/rooms/{room_id}/mic-toggle")
 def toggle_microphone(
     room_id: UUID,
     request: MicToggleRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Toggle microphone status"""
     user_id = current_user.id
@@ -166,17 +201,24 @@ def toggle_microphone(
             raise HTTPException(status_code=400, detail="Invalid user ID")
 
     coworkingservice.toggle_microphone(db, room_id, user_id, request.is_muted)
+    data = {"userId": str(user_id), "isMuted": request.is_muted}
+    if request.is_muted:
+        # Muting also stops speaking
+        data["isSpeaking"] = False
+    background_tasks.add_task(
+        websocket_manager.publish_room_event, str(room_id), "mic-toggled", data, str(user_id)
+    )
     return {"success": True, "is_muted": request.is_muted}
 
 
 @router.put("/rooms/{room_id}/speaking")
-def update_speaking_status(
+async def update_speaking_status(
     room_id: UUID,
     request: SpeakingStatusRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
-    """Update speaking status"""
+    """Update speaking status (in memory; other participants get a debounced speaking-changed event)"""
     user_id = current_user.id
     if not isinstance(user_id, UUID):
         try:
@@ -184,7 +226,7 @@ def update_speaking_status(
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid user ID")
 
-    coworkingservice.update_speaking_status(db, room_id, user_id, request.is_speaking)
+    await coworkingservice.update_speaking_status(db, room_id, user_id, request.is_speaking)
     return {"success": True, "is_speaking": request.is_speaking}
 
 
@@ -192,8 +234,9 @@ def update_speaking_status(
 def send_emoji(
     room_id: UUID,
     request: EmojiReactionRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Send emoji reaction"""
     user_id = current_user.id
@@ -203,7 +246,12 @@ def send_emoji(
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid user ID")
 
-    return coworkingservice.send_emoji_reaction(db, room_id, user_id, request.emoji)
+    message = coworkingservice.send_emoji_reaction(db, room_id, user_id, request.emoji)
+    background_tasks.add_task(
+        websocket_manager.publish_room_event,
+        str(room_id), "emoji-reaction", {**message.model_dump(mode="json"), "emoji": request.emoji}, str(user_id)
+    )
+    return message
 
 
 # Room Management Endpoints
@@ -212,7 +260,7 @@ def send_emoji(
 def delete_room(
     room_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Delete a coworking room (for testing/cleanup purposes)"""
     room = db.query(CoworkingRoom).filter(CoworkingRoom.id == room_id).first()
@@ -228,6 +276,8 @@ def delete_room(
     # Delete the room
     db.delete(room)
     db.commit()
+    coworkingservice.invalidate_room_list()
+    room_message_buffer.drop(room_id)
     
     return {"success": True, "message": "Room deleted successfully"}
 
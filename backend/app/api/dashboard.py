@@ -1,34 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services import timetrackerservice, taskservice, shutdownservice
-from app.core.database import get_db
-from app.core.auth import get_current_user
+from app.services.clock_batcher import clock_batcher
+from app.services.session_cache import session_cache, WORK
+from app.core.database import get_db, get_async_db
+from app.core.auth import get_current_user_cached
+from app.core.user_cache import CachedUser
 from app.schemas.timelog import TimeLogResponse, EndSessionRequest, FocusTimeResponse
 from app.schemas.shutdown import ShutdownReflectionCreate, ShutdownReflectionResponse, ShutdownSummaryResponse
 from typing import List
 from app.models.timelog import Timelog
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Dashboard"])
 
 @router.post("/clock-in", response_model=TimeLogResponse)
-def clock_in(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    # request = StartSessionRequest(user_id=user.id, type="clock-in")
-    result = timetrackerservice.clock_in(db, user.id)
+async def clock_in(user: CachedUser = Depends(get_current_user_cached)):
+    # Concurrent clock-ins are written together; an open work session is returned as is
+    result = await clock_batcher.clock_in(user.id)
     return fix_timezone_for_timelog(result)
 
 @router.post("/clock-out", response_model=TimeLogResponse)
-def clock_out(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    # Get the current active work session specifically for the user
-    current_work_session = db.query(Timelog).filter(
-        Timelog.user_id == user.id,
-        Timelog.type == "work",
-        Timelog.end_time == None
-    ).order_by(Timelog.start_time.desc()).first()
-    
-    if not current_work_session:
-        raise HTTPException(status_code=404, detail="No active work session found to end.")
-    
-    result = timetrackerservice.clock_out(db, user.id)
+async def clock_out(user: CachedUser = Depends(get_current_user_cached)):
+    # Ends the user's active work session; 404 when there is none
+    result = await clock_batcher.clock_out(user.id)
     return fix_timezone_for_timelog(result)
 
 
@@ -53,23 +51,20 @@ def fix_timezone_for_timelog(timelog: Timelog) -> Timelog:
     return timelog
 
 @router.get("/current-session", response_model=TimeLogResponse)
-def get_current_session(db: Session = Depends(get_db), user = Depends(get_current_user)):
-    # Get current work session specifically for dashboard
-    result = db.query(Timelog).filter(
-        Timelog.user_id == user.id,
-        Timelog.type == "work",
-        Timelog.end_time == None
-    ).order_by(Timelog.start_time.desc()).first()
-    
+async def get_current_session(db: AsyncSession = Depends(get_async_db), user: CachedUser = Depends(get_current_user_cached)):
+    # Get current work session specifically for dashboard (cached until the next clock event)
+    async def load():
+        session = await timetrackerservice.get_current_work_session_async(db, user.id)
+        # Fix timezone issues for response
+        return TimeLogResponse.model_validate(fix_timezone_for_timelog(session)) if session else None
+
+    result = await session_cache.get_or_load(user.id, WORK, load)
     if not result:
         raise HTTPException(status_code=404, detail="No ongoing work session")
-    
-    # Fix timezone issues for response
-    result = fix_timezone_for_timelog(result)
     return result
 
 @router.get("/last-session", response_model=TimeLogResponse)
-def get_last_session(db: Session = Depends(get_db), user = Depends(get_current_user)):
+def get_last_session(db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached)):
     # Get the most recent completed work session
     result = timetrackerservice.get_last_session(db, user.id)
     if not result:
@@ -80,11 +75,11 @@ def get_last_session(db: Session = Depends(get_db), user = Depends(get_current_u
     return result
 
 @router.get("/data")
-def get_dashboard_data(db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def get_dashboard_data(db: AsyncSession = Depends(get_async_db), user: CachedUser = Depends(get_current_user_cached)):
     # Get dashboard data for the frontend
     try:
         # Get all tasks
-        all_tasks = taskservice.get_tasks(db, user.id)
+        all_tasks = await taskservice.get_tasks_async(db, user.id)
         
         # Get tasks for today's progress - includes:
         # 1. Tasks due today (regardless of completion status) 
@@ -117,8 +112,8 @@ def get_dashboard_data(db: Session = Depends(get_db), user = Depends(get_current
         today_progress_tasks = list({task.id: task for task in today_progress_tasks}.values())
         
         # Get today's focus time
-        total_focus_time = timetrackerservice.get_focus_time(db, user.id)
-        print(f"🎯 Dashboard focus time for user {user.id}: {total_focus_time} seconds")
+        total_focus_time = await timetrackerservice.get_focus_time_async(db, user.id)
+        logger.debug("Dashboard focus time for user %s: %s seconds", user.id, total_focus_time)
         
         # Return data in expected format
         return {
@@ -130,10 +125,7 @@ def get_dashboard_data(db: Session = Depends(get_db), user = Depends(get_current
             "points": 0  # Placeholder for user points/streak
         }
     except Exception as e:
-        print(f"❌ Dashboard API error: {e}")
-        print(f"❌ Exception type: {type(e)}")
-        import traceback
-        print(f"❌ Full traceback: {traceback.format_exc()}")
+        logger.exception("Dashboard API error: %s", e)
         # Return default data if there's an error
         return {
             "tasks": [],
@@ -146,8 +138,8 @@ def get_dashboard_data(db: Session = Depends(get_db), user = Depends(get_current
 
 # Today's progress Focus Time 
 @router.get("/focus-sessions/all-daily-focus", response_model=FocusTimeResponse)
-def get_focus_time(db: Session = Depends(get_db), user = Depends(get_current_user)):
-    total_focus_time = timetrackerservice.get_focus_time(db, user.id)
+async def get_focus_time(db: AsyncSession = Depends(get_async_db), user: CachedUser = Depends(get_current_user_cached)):
+    total_focus_time = await timetrackerservice.get_focus_time_async(db, user.id)
     return {"total_focus_time": total_focus_time}
 
 
@@ -160,7 +152,7 @@ def get_focus_time(db: Session = Depends(get_db), user = Depends(get_current_use
 # Shutdown Reflection Endpoints
 
 @router.get("/shutdown-summary", response_model=ShutdownSummaryResponse)
-def get_shutdown_summary(db: Session = Depends(get_db), user = Depends(get_current_user)):
+def get_shutdown_summary(db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached)):
     """
     Get today's shutdown summary including:
     - Tasks completed today
@@ -176,7 +168,7 @@ def get_shutdown_summary(db: Session = Depends(get_db), user = Depends(get_curre
 def create_shutdown_reflection(
     reflection: ShutdownReflectionCreate,
     db: Session = Depends(get_db), 
-    user = Depends(get_current_user)
+    user: CachedUser = Depends(get_current_user_cached)
 ):
     """
     Create a new shutdown reflection for today. Records productivity rating, reflection notes, and mindful disconnect checklist.
@@ -188,14 +180,14 @@ def create_shutdown_reflection(
 def get_shutdown_history(
     limit: int = 30,
     db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    user: CachedUser = Depends(get_current_user_cached)
 ):
     """
     Get historical shutdown reflections for the user.
     """
     return shutdownservice.get_shutdown_history(db, user.id, limit)
 @router.get("/shutdown-summary")
-def get_shutdown_summary(db: Session = Depends(get_db), user = Depends(get_current_user)):
+def get_shutdown_summary(db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached)):
     """Get summary data for shutdown modal"""
     try:
         # Get today's focus time
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends
+
+from app.core.auth import require_internal_access
+from app.core.database import get_pool_stats
+from app.core.idempotency import idempotency_store
+from app.core.user_cache import user_cache
+from app.services.clock_batcher import clock_batcher
+from app.services.room_message_buffer import room_message_buffer
+from app.services.session_cache import session_cache
+from app.services.websocket_manager import websocket_manager
+
+# Operational data: token or loopback only (see require_internal_access)
+router = APIRouter(prefix="/internal/metrics", tags=["internal"], dependencies=[Depends(require_internal_access)])
+
+
+@router.get("/auth-cache")
+def auth_cache_metrics():
+    """Hit/miss counters for the authenticated user cache (non-sensitive, per worker)"""
+    return user_cache.stats()
+
+
+@router.get("/db-pool")
+def db_pool_metrics():
+    """Connection pool occupancy, checkout wait histogram and invalidations (per worker)"""
+    return get_pool_stats()
+
+
+@router.get("/room-messages")
+def room_message_buffer_metrics():
+    """Hit/miss counters for the in-memory room message buffer (per worker)"""
+    return room_message_buffer.stats()
+
+
+@router.get("/websockets")
+def websocket_metrics():
+    """Room connections, queued outbound messages and slow-consumer counters (per worker)"""
+    return websocket_manager.stats()
+
+
+@router.get("/clock-batches")
+def clock_batch_metrics():
+    """Clock-in/clock-out batches written and their average size (per worker)"""
+    return clock_batcher.stats()
+
+
+@router.get("/idempotency")
+def idempotency_metrics():
+    """Stored and replayed Idempotency-Key responses (per worker)"""
+    return idempotency_store.stats()
+
+
+@router.get("/session-cache")
+def session_cache_metrics():
+    """Hit/miss and invalidation counters for the current-session cache (per worker)"""
+    return session_cache.stats()
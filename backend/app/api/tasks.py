@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import List
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TimeLogResponse
 # from app.models.task import Task
-from app.core.auth import get_current_user
-from app.core.database import get_db
+from app.core.auth import get_current_user_cached
+from app.core.user_cache import CachedUser
+from app.core.database import get_db, get_async_db
 # from app.api import task as crud_task
-from app.models.user import User
 from app.services.taskservice import start_timer, stop_timer, get_time_logs
 from app.services import taskservice
 
@@ -19,7 +20,7 @@ router = APIRouter(tags=["Tasks"])
 def create(
     task_in: TaskCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     user_id = current_user.id
     # Ensure user_id is a UUID, not a SQLAlchemy Column
@@ -32,14 +33,14 @@ def create(
 
 
 @router.get("/", response_model=list[TaskResponse])
-def read_all(
+async def read_all(
     completed: bool = None,
     priority: str = None,
     tags: str = None,  # Comma-separated tags
     due_today: bool = None,
     upcoming: bool = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """
     Get all tasks for the current user with optional filtering.
@@ -62,14 +63,14 @@ def read_all(
     if tags:
         tags_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
     
-    return taskservice.get_tasks(db, user_id, completed, priority, tags_list, due_today, upcoming)
+    return await taskservice.get_tasks_async(db, user_id, completed, priority, tags_list, due_today, upcoming)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
 def read(
     task_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     user_id = current_user.id
     if not isinstance(user_id, UUID):
@@ -88,7 +89,7 @@ def update(
     task_id: UUID,
     task_in: TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     user_id = current_user.id
     if not isinstance(user_id, UUID):
@@ -103,7 +104,7 @@ def update(
 def delete(
     task_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     user_id = current_user.id
     if not isinstance(user_id, UUID):
@@ -119,7 +120,7 @@ def delete(
 def complete_task(
     task_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Mark a task as completed"""
     user_id = current_user.id
@@ -138,7 +139,7 @@ def complete_task(
 def uncomplete_task(
     task_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Mark a task as not completed"""
     user_id = current_user.id
@@ -158,7 +159,7 @@ def start_task_timer(
     task_id: UUID,
     request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     user_id = current_user.id
     if not isinstance(user_id, UUID):
@@ -174,7 +175,7 @@ def stop_task_timer(
     task_id: UUID,
     request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     user_id = current_user.id
     if not isinstance(user_id, UUID):
@@ -190,7 +191,7 @@ def get_task_time_logs(
     task_id: UUID,
     request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     user_id = current_user.id
     if not isinstance(user_id, UUID):
@@ -204,7 +205,7 @@ def get_task_time_logs(
 @router.get("/status/today", response_model=List[TaskResponse])
 def get_tasks_for_today(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Get all tasks due today or scheduled to start today"""
     user_id = current_user.id
@@ -219,7 +220,7 @@ def get_tasks_for_today(
 @router.get("/status/upcoming", response_model=List[TaskResponse])
 def get_upcoming_tasks(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Get all upcoming tasks (due in future and not completed)"""
     user_id = current_user.id
@@ -234,7 +235,7 @@ def get_upcoming_tasks(
 @router.get("/status/completed", response_model=List[TaskResponse])
 def get_completed_tasks(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Get all completed tasks"""
     user_id = current_user.id
@@ -249,7 +250,7 @@ def get_completed_tasks(
 @router.get("/status/pending", response_model=List[TaskResponse])
 def get_pending_tasks(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user_cached)
 ):
     """Get all pending (not completed) tasks"""
     user_id = current_user.id
@@ -1,75 +1,78 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
 from app.schemas.timelog import StartSessionRequest, EndSessionRequest, FocusSessionResponse, PauseSessionRequest, ResumeSessionRequest, DailySummaryResponse
 from app.services import timetrackerservice
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user_cached
+from app.core.user_cache import CachedUser
+from app.core.idempotency import Idempotency, get_idempotency
 # from app.models.timelog import Timelog
 
 router = APIRouter(tags=["time-log"])
 
 @router.post("/focus-sessions/start", response_model=FocusSessionResponse)
-def start_session(request: StartSessionRequest, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def start_session(request: StartSessionRequest, db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached), idempotency: Idempotency = Depends(get_idempotency)):
     # Use authenticated user's ID
     request.user_id = user.id
-    return timetrackerservice.start_session(db, request, type="focus")
+    return idempotency.run(lambda: timetrackerservice.start_session(db, request, type="focus"))
 
 
 @router.post("/focus-sessions/{session_id}/end", response_model=FocusSessionResponse)
-def end_session(session_id: str, request: EndSessionRequest, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def end_session(session_id: str, request: EndSessionRequest, db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached), idempotency: Idempotency = Depends(get_idempotency)):
     # Set session_id from URL parameter
     request.session_id = session_id
-    return timetrackerservice.end_session(db, request, type="focus")
+    return idempotency.run(lambda: timetrackerservice.end_session(db, request, type="focus"))
 
 @router.post("/focus-sessions/{session_id}/pause", response_model=FocusSessionResponse)
-def pause_session(session_id: str, request: PauseSessionRequest, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def pause_session(session_id: str, request: PauseSessionRequest, db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached), idempotency: Idempotency = Depends(get_idempotency)):
     request.session_id = session_id
-    return timetrackerservice.pause_session(db, request)
+    return idempotency.run(lambda: timetrackerservice.pause_session(db, request))
 
 @router.post("/focus-sessions/{session_id}/resume", response_model=FocusSessionResponse)
-def resume_session(session_id: str, request: ResumeSessionRequest, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def resume_session(session_id: str, request: ResumeSessionRequest, db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached), idempotency: Idempotency = Depends(get_idempotency)):
     request.session_id = session_id
-    return timetrackerservice.resume_session(db, request)
+    return idempotency.run(lambda: timetrackerservice.resume_session(db, request))
 
 @router.post("/break-sessions/start", response_model=FocusSessionResponse)
-def start_break(request: StartSessionRequest, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def start_break(request: StartSessionRequest, db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached), idempotency: Idempotency = Depends(get_idempotency)):
     request.user_id = user.id
-    return timetrackerservice.start_session(db, request, type="break")
+    return idempotency.run(lambda: timetrackerservice.start_session(db, request, type="break"))
 
 
 @router.post("/break-sessions/{session_id}/end", response_model=FocusSessionResponse)
-def end_break(session_id: str, request: EndSessionRequest, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def end_break(session_id: str, request: EndSessionRequest, db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached), idempotency: Idempotency = Depends(get_idempotency)):
     request.session_id = session_id
-    return timetrackerservice.end_session(db, request, type="break")
+    return idempotency.run(lambda: timetrackerservice.end_session(db, request, type="break"))
 
 @router.post("/break-sessions/{session_id}/pause", response_model=FocusSessionResponse)
-def pause_break(session_id: str, request: PauseSessionRequest, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def pause_break(session_id: str, request: PauseSessionRequest, db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached), idempotency: Idempotency = Depends(get_idempotency)):
     request.session_id = session_id
-    return timetrackerservice.pause_session(db, request)
+    return idempotency.run(lambda: timetrackerservice.pause_session(db, request))
 
 @router.post("/break-sessions/{session_id}/resume", response_model=FocusSessionResponse)
-def resume_break(session_id: str, request: ResumeSessionRequest, db: Session = Depends(get_db), user = Depends(get_current_user)):
+def resume_break(session_id: str, request: ResumeSessionRequest, db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached), idempotency: Idempotency = Depends(get_idempotency)):
     request.session_id = session_id
-    return timetrackerservice.resume_session(db, request)
+    return idempotency.run(lambda: timetrackerservice.resume_session(db, request))
 
 @router.get("/time-logs/daily-summary", response_model=DailySummaryResponse)
-def get_daily_summary(db: Session = Depends(get_db), user = Depends(get_current_user)):
-    return timetrackerservice.get_daily_summary(db, user.id)
+async def get_daily_summary(db: AsyncSession = Depends(get_async_db), user: CachedUser = Depends(get_current_user_cached)):
+    return await timetrackerservice.get_daily_summary_async(db, user.id)
 
 @router.get("/time-logs/current", response_model=FocusSessionResponse)
-def current_session(db: Session = Depends(get_db), user = Depends(get_current_user)):
-    result = timetrackerservice.get_current_session(db, user.id)
+async def current_session(db: AsyncSession = Depends(get_async_db), user: CachedUser = Depends(get_current_user_cached)):
+    result = await timetrackerservice.get_current_session_response_async(db, user.id)
     if not result:
         raise HTTPException(status_code=404, detail="No ongoing session")
-    return timetrackerservice.build_focus_session_response(result)
+    return result
 
 @router.delete("/time-logs/clear-all")
-def clear_all_sessions(db: Session = Depends(get_db), user = Depends(get_current_user)):
+def clear_all_sessions(db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached)):
     """Clear all timetracker sessions for clean slate"""
     return timetrackerservice.clear_all_sessions(db, user.id)
 
 @router.delete("/time-logs/clear-today")
-def clear_today_sessions(db: Session = Depends(get_db), user = Depends(get_current_user)):
+def clear_today_sessions(db: Session = Depends(get_db), user: CachedUser = Depends(get_current_user_cached)):
     """Clear only today's timetracker sessions for fresh start"""
     return timetrackerservice.clear_today_sessions(db, user.id)
 
@@ -5,6 +5,9 @@ from app.services import usersettingsservice
 from app.models.user import User
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.user_cache import user_cache
+from app.services.room_message_buffer import room_message_buffer
+from app.services.session_cache import session_cache
 from typing import Dict, Any
 import logging
 from pydantic import BaseModel
@@ -30,6 +33,7 @@ def delete_current_user(
         from app.models.timelog import Timelog
         from app.models.task import Task
         from app.models.shutdown_reflection import ShutdownReflection
+        from app.models.daily_focus_rollup import DailyFocusRollup
         
         # Delete user settings first (most likely to cause the constraint issue)
         user_settings = db.query(UserSettings).filter(UserSettings.user_id == user_id).first()
@@ -42,6 +46,9 @@ def delete_current_user(
         for log in time_logs:
             db.delete(log)
         logger.info(f"Deleted {len(time_logs)} time logs for user {user_id}")
+
+        # Delete daily focus rollups
+        db.query(DailyFocusRollup).filter(DailyFocusRollup.user_id == user_id).delete(synchronize_session=False)
         
         # Delete tasks
         tasks = db.query(Task).filter(Task.user_id == user_id).all()
@@ -58,10 +65,13 @@ def delete_current_user(
         # Try to delete coworking related data (if models exist)
         try:
             from app.models.coworking import RoomParticipant, RoomMessage
+            from app.services import coworkingservice
             
-            # Delete room participations
+            # Delete room participations, giving back the seats still held
             participations = db.query(RoomParticipant).filter(RoomParticipant.user_id == user_id).all()
             for participation in participations:
+                if participation.left_at is None:
+                    coworkingservice.release_seat(db, participation.room_id)
                 db.delete(participation)
             logger.info(f"Deleted {len(participations)} room participations for user {user_id}")
             
@@ -96,6 +106,10 @@ def delete_current_user(
         # Finally delete the user
         db.delete(current_user)
         db.commit()
+        user_cache.invalidate(user_id)
+        session_cache.invalidate(user_id)
+        # Their buffered chat messages would otherwise keep being served as recent history
+        room_message_buffer.clear()
         
         logger.info(f"Successfully deleted user {user_id}")
         return {"message": "Account deleted successfully", "success": True}
@@ -149,6 +163,7 @@ def update_user_profile(
         if payload.avatar_url is not None:
             current_user.avatar_url = payload.avatar_url
         db.commit()
+        user_cache.invalidate(current_user.id)
         db.refresh(current_user)
         return {
             "message": "Profile updated successfully",
@@ -407,6 +422,7 @@ def complete_onboarding(
     try:
         current_user.onboarding_completed = True
         db.commit()
+        user_cache.invalidate(current_user.id)
         db.refresh(current_user)
         
         return {
@@ -1,56 +1,95 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
 import json
 import logging
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.database import async_session_scope
 from app.core.auth import get_current_user_websocket
-from app.models.room import CoworkingRoom
 from app.models.coworking import RoomParticipant
+from app.services import coworkingservice
 from app.services.websocket_manager import websocket_manager
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Close code for a room id that is not a UUID
+INVALID_ROOM_CLOSE_CODE = 4004
+
 @router.websocket("/ws/rooms/{room_id}")
 async def websocket_endpoint(
     websocket: WebSocket, 
     room_id: str,
-    token: str,
-    db: Session = Depends(get_db)
+    token: str
 ):
-    """WebSocket endpoint for WebRTC signaling in coworking rooms"""
+    """WebSocket endpoint for WebRTC signaling in coworking rooms.
+
+    The socket can stay open for hours, so no database session is held for its
+    lifetime: authentication and the participant check use a short-lived session
+    that is closed before the receive loop starts.
+
+    Clients send {"type": "heartbeat"} every WS_HEARTBEAT_INTERVAL_SECONDS and get a
+    heartbeat-ack back. A socket silent for WS_HEARTBEAT_TIMEOUT_SECONDS is closed, and
+    a participant with no heartbeating socket is removed from the room by the reaper.
+    """
     
+    # Manager keys and REST-published events use the canonical form (str(UUID))
     try:
-        # Authenticate user from token
-        user = await get_current_user_websocket(token, db)
+        room_uuid = UUID(room_id)
+    except ValueError:
+        await websocket.close(code=INVALID_ROOM_CLOSE_CODE, reason="Invalid room id")
+        return
+    room_id = str(room_uuid)
+
+    try:
+        async with async_session_scope() as db:
+            # Authenticate user from token
+            user = await get_current_user_websocket(token, db)
+            # Verify user is in the room
+            participant = None
+            if user:
+                participant = (await db.execute(
+                    select(RoomParticipant.id).where(
+                        RoomParticipant.room_id == room_uuid,
+                        RoomParticipant.user_id == user.id,
+                        RoomParticipant.left_at.is_(None)
+                    ).limit(1)
+                )).first()
+
         if not user:
             await websocket.close(code=4001, reason="Authentication failed")
             return
             
         user_id = str(user.id)
         
-        # Verify user is in the room
-        room_uuid = UUID(room_id)
-        participant = db.query(RoomParticipant).filter(
-            RoomParticipant.room_id == room_uuid,
-            RoomParticipant.user_id == user.id,
-            RoomParticipant.left_at.is_(None)
-        ).first()
-        
         if not participant:
             await websocket.close(code=4003, reason="Not a room participant")
             return
         
         # Connect to WebSocket
         await websocket_manager.connect(websocket, room_id, user_id)
-        
+
+        # Registered from here on: every exit path must go through disconnect()
         try:
+            # Backfill recent chat from the room's message buffer (a connection is only
+            # checked out when the buffer is cold)
+            async with async_session_scope() as db:
+                history, _ = await coworkingservice.get_room_messages_async(db, room_uuid)
+            await websocket_manager.send_to_connection(websocket, {
+                "type": "message-history",
+                "data": {"messages": [message.model_dump(mode="json") for message in history]},
+                "roomId": room_id
+            })
+
             while True:
                 # Receive WebRTC signaling messages
                 data = await websocket.receive_text()
+                websocket_manager.touch(websocket)
                 message = json.loads(data)
+
+                if message.get("type") == "heartbeat":
+                    await websocket_manager.send_to_connection(websocket, {"type": "heartbeat-ack"})
+                    continue
                 
                 # Validate message structure
                 if not all(key in message for key in ["type", "from", "roomId"]):
@@ -64,7 +103,7 @@ async def websocket_endpoint(
                     # WebRTC signaling messages - forward to target user
                     target_user = message.get("to")
                     if target_user:
-                        await websocket_manager.send_to_user(target_user, message)
+                        await websocket_manager.send_to_user(target_user, message, room_id)
                     else:
                         # Broadcast to all other users in room
                         await websocket_manager.broadcast_to_room(
@@ -84,6 +123,11 @@ async def websocket_endpoint(
             logger.info(f"WebSocket disconnected for user {user_id}")
         except Exception as e:
             logger.error(f"WebSocket error for user {user_id}: {e}")
+            try:
+                await websocket.close(code=4000, reason="Connection error")
+            except Exception:
+                # Already closed by the client or the server
+                pass
         finally:
             await websocket_manager.disconnect(websocket)
             
@@ -1,9 +1,14 @@
+import hmac
 from fastapi import Depends, HTTPException, status, Request
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.models.user import User
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.config import settings
+from app.core.user_cache import CachedUser, user_cache
 from uuid import UUID
 
 def _extract_bearer_token(request: Request) -> str | None:
@@ -48,6 +53,62 @@ def get_current_user(token: str = Depends(_bearer_token_dependency), db: Session
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
 
+def get_current_user_cached(token: str = Depends(_bearer_token_dependency)) -> CachedUser:
+    """Fast-path auth for routes that only need the user's id and status flags.
+
+    Serves the slim user projection from the in-process cache and only opens a
+    short-lived session on a cache miss, so a hit costs no DB round trip.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = UUID(payload.get("sub"))
+    except (JWTError, ValueError, TypeError):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    db = SessionLocal()
+    try:
+        row = db.query(
+            User.id, User.is_active, User.is_verified, User.onboarding_completed
+        ).filter(User.id == user_id).first()
+    finally:
+        db.close()
+    if not row:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    cached = CachedUser(
+        id=row.id,
+        is_active=bool(row.is_active),
+        is_verified=bool(row.is_verified),
+        onboarding_completed=bool(row.onboarding_completed),
+    )
+    user_cache.set(cached)
+    return cached
+
+
+# Clients allowed to read the operational endpoints when INTERNAL_METRICS_TOKEN is unset
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+def require_internal_access(request: Request) -> None:
+    """
+    Dependency for operational endpoints (/metrics, /internal/metrics/*).
+    With INTERNAL_METRICS_TOKEN set the scraper must send it as a Bearer token;
+    without it only loopback clients are served. Others get a 404.
+    """
+    expected = settings.INTERNAL_METRICS_TOKEN
+    if expected:
+        token = _extract_bearer_token(request) or ""
+        if hmac.compare_digest(token.encode(), expected.encode()):
+            return
+    elif request.client is not None and request.client.host in LOOPBACK_HOSTS:
+        return
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
 def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
     """
     Dependency to verify the current user has admin privileges.
@@ -61,16 +122,14 @@ def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-async def get_current_user_websocket(token: str, db: Session) -> User:
+async def get_current_user_websocket(token: str, db: AsyncSession) -> User:
     """Authenticate user for WebSocket connection"""
     try:
         from app.core.config import settings
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
+        user_id = UUID(payload.get("sub"))
+    except (JWTError, ValueError, TypeError):
         return None
     
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalar_one_or_none()
@@ -30,6 +30,18 @@ def get_secret(secret_name: str, region_name: str | None = None):
     except Exception:
         return {}
 
+# Connection pool presets selected with DB_POOL_PROFILE. Individual DB_POOL_* env vars
+# override single values of the selected preset.
+DB_POOL_PROFILES = {
+    # Uvicorn workers: sync routes run in the threadpool, async routes share the async pool
+    "api": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True},
+    # Celery workers run one task at a time per process; keep idle connections low
+    "celery-worker": {"pool_size": 2, "max_overflow": 2, "pool_timeout": 60, "pool_recycle": 1800, "pool_pre_ping": True},
+    # Schema scripts and one-off maintenance: a single long-lived connection
+    "migration": {"pool_size": 1, "max_overflow": 0, "pool_timeout": 300, "pool_recycle": -1, "pool_pre_ping": False},
+}
+
+
 class Settings:
     def __init__(self):
         # Load environment variables first
@@ -71,6 +83,18 @@ class Settings:
             # Fallback for local development
             self.DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./clockko.db")
 
+        self.DB_POOL_PROFILE = os.getenv("DB_POOL_PROFILE", "api")
+        if self.DB_POOL_PROFILE not in DB_POOL_PROFILES:
+            raise ValueError(
+                f"Unknown DB_POOL_PROFILE '{self.DB_POOL_PROFILE}', expected one of {', '.join(DB_POOL_PROFILES)}"
+            )
+        pool_preset = DB_POOL_PROFILES[self.DB_POOL_PROFILE]
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", pool_preset["pool_size"]))
+        self.DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", pool_preset["max_overflow"]))
+        self.DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", pool_preset["pool_timeout"]))
+        self.DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", pool_preset["pool_recycle"]))
+        self.DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", str(pool_preset["pool_pre_ping"])).lower() == "true"
+
         # ====================
         # Security (JWT)
         # ====================
@@ -139,6 +163,15 @@ class Settings:
         # Region for AWS SDKs
         self.AWS_REGION = os.getenv("AWS_REGION", os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
 
+        # ====================
+        # Logging
+        # ====================
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if self.DEBUG else "INFO").upper()
+        # "json" for structured output (default), "text" for human-readable local logs
+        self.LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+        # Fraction of successful requests written to the access log (5xx are always logged)
+        self.ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0" if self.DEBUG else "0.1"))
+
         # ====================
         # OTP Configuration
         # ====================
@@ -150,5 +183,101 @@ class Settings:
         # ====================
         self.TWO_FACTOR_ENCRYPTION_KEY = os.getenv("TWO_FACTOR_ENCRYPTION_KEY", "")
 
+        # ====================
+        # Authenticated user cache
+        # ====================
+        # In-process LRU+TTL cache of the slim user projection used by get_current_user_cached;
+        # invalidations reach every worker through the WS_BACKPLANE transport, the TTL bounds
+        # staleness if an invalidation is lost
+        self.USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+        self.USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+        self.USER_CACHE_CHANNEL = os.getenv("USER_CACHE_CHANNEL", "clockko:users:invalidate")
+
+        # ====================
+        # Operational endpoints
+        # ====================
+        # Bearer token required by /metrics and /internal/metrics/*; when empty they only answer loopback clients
+        self.INTERNAL_METRICS_TOKEN = os.getenv("INTERNAL_METRICS_TOKEN", "")
+
+        # ====================
+        # Idempotency keys
+        # ====================
+        # Stored responses for retried POSTs carrying an Idempotency-Key (per worker)
+        self.IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+        self.IDEMPOTENCY_CACHE_MAX_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_MAX_SIZE", "10000"))
+
+        # ====================
+        # Current-session cache
+        # ====================
+        # Open-session responses for the timer widgets; transitions invalidate them on every worker
+        # through the WS_BACKPLANE transport, the TTL bounds staleness if an invalidation is lost
+        self.SESSION_CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "30"))
+        self.SESSION_CACHE_MAX_SIZE = int(os.getenv("SESSION_CACHE_MAX_SIZE", "10000"))
+        self.SESSION_CACHE_CHANNEL = os.getenv("SESSION_CACHE_CHANNEL", "clockko:sessions:invalidate")
+
+        # ====================
+        # Challenges leaderboard
+        # ====================
+        # How long the cached top-N leaderboard snapshot is served before it is rebuilt
+        self.LEADERBOARD_CACHE_TTL_SECONDS = int(os.getenv("LEADERBOARD_CACHE_TTL_SECONDS", "30"))
+
+        # ====================
+        # Coworking room list
+        # ====================
+        # How long the room list snapshot (with participant counts) is served; joins and leaves
+        # on this worker invalidate it immediately, other workers catch up within the TTL
+        self.ROOM_LIST_CACHE_TTL_SECONDS = float(os.getenv("ROOM_LIST_CACHE_TTL_SECONDS", "2"))
+        # Recent chat messages kept in memory per room for history reads and WebSocket backfill
+        self.ROOM_MESSAGE_BUFFER_SIZE = int(os.getenv("ROOM_MESSAGE_BUFFER_SIZE", "100"))
+        # A room's buffered tail is reloaded after this long, picking up messages written by other workers
+        self.ROOM_MESSAGE_BUFFER_TTL_SECONDS = float(os.getenv("ROOM_MESSAGE_BUFFER_TTL_SECONDS", "5"))
+        # Speaking-state flips are coalesced per room and published at most once per window
+        self.SPEAKING_DEBOUNCE_SECONDS = float(os.getenv("SPEAKING_DEBOUNCE_SECONDS", "0.25"))
+
+        # ====================
+        # Room WebSockets
+        # ====================
+        # Outbound messages buffered per connection before the slow-consumer policy applies
+        self.WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+        # drop-oldest: discard the oldest queued message; disconnect: close the slow connection
+        self.WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop-oldest").lower()
+        if self.WS_SLOW_CONSUMER_POLICY not in ("drop-oldest", "disconnect"):
+            raise ValueError(
+                f"Unknown WS_SLOW_CONSUMER_POLICY '{self.WS_SLOW_CONSUMER_POLICY}', expected drop-oldest or disconnect"
+            )
+        # Cross-worker fan-out: memory (single worker) or redis pub/sub between workers/containers
+        self.WS_BACKPLANE = os.getenv("WS_BACKPLANE", "memory").lower()
+        if self.WS_BACKPLANE not in ("memory", "redis"):
+            raise ValueError(f"Unknown WS_BACKPLANE '{self.WS_BACKPLANE}', expected memory or redis")
+        self.WS_BACKPLANE_REDIS_URL = os.getenv(
+            "WS_BACKPLANE_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+        )
+        self.WS_BACKPLANE_CHANNEL = os.getenv("WS_BACKPLANE_CHANNEL", "clockko:ws:rooms")
+        # Clients send {"type": "heartbeat"} every interval; sockets silent for the timeout are closed
+        self.WS_HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("WS_HEARTBEAT_INTERVAL_SECONDS", "15"))
+        self.WS_HEARTBEAT_TIMEOUT_SECONDS = float(os.getenv("WS_HEARTBEAT_TIMEOUT_SECONDS", "45"))
+        # Participations whose last heartbeat is older than this are closed by the reaper
+        self.ROOM_PARTICIPANT_STALE_SECONDS = float(os.getenv("ROOM_PARTICIPANT_STALE_SECONDS", "90"))
+        self.ROOM_REAPER_INTERVAL_SECONDS = float(os.getenv("ROOM_REAPER_INTERVAL_SECONDS", "15"))
+
+        # ====================
+        # Clock-in / clock-out
+        # ====================
+        # Clock events arriving within this window are written in one transaction
+        self.CLOCK_BATCH_WINDOW_SECONDS = float(os.getenv("CLOCK_BATCH_WINDOW_SECONDS", "0.005"))
+        self.CLOCK_BATCH_MAX_SIZE = int(os.getenv("CLOCK_BATCH_MAX_SIZE", "500"))
+
+
+    @property
+    def db_pool_options(self) -> dict:
+        """Keyword arguments for create_engine / create_async_engine"""
+        return {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+        }
+
 
 settings = Settings()
\ No newline at end of file
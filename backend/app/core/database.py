@@ -1,15 +1,68 @@
 import os
-from sqlalchemy import create_engine
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 from app.core.config import settings
+from app.core.metrics import PoolMetrics, register_collector
 
 # Load environment variables
 load_dotenv()
 
 DATABASE_URL = settings.DATABASE_URL
 
+
+class _InstrumentedPoolMixin:
+    """Times every connection checkout so pool exhaustion shows up before requests time out"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _instrument_engine(sync_engine):
+    """Count new connections and invalidations on whatever pool the engine currently uses"""
+    if not isinstance(sync_engine.pool, _InstrumentedPoolMixin):
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        sync_engine.pool.metrics.record_connect()
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        sync_engine.pool.metrics.record_invalidation()
+
 # Create SQLAlchemy engine with database-specific configurations
 if "sqlite" in DATABASE_URL:
     # SQLite-specific configuration
@@ -21,15 +74,16 @@ if "sqlite" in DATABASE_URL:
 elif "postgresql" in DATABASE_URL:
     # PostgreSQL-specific configuration
     # Use sslmode=prefer for development (falls back to non-SSL), require for production
+    # Pool sizing comes from the DB_POOL_PROFILE preset (see core/config.py)
     ssl_mode = "require" if not settings.DEBUG else "prefer"
     engine = create_engine(
         DATABASE_URL,
-        pool_size=5,
-        max_overflow=10,
-        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
         echo=settings.DEBUG,
-        connect_args={"sslmode": ssl_mode}    
+        connect_args={"sslmode": ssl_mode},
+        **settings.db_pool_options
         )
+    _instrument_engine(engine)
 else:
     # Generic configuration for other databases
     engine = create_engine(DATABASE_URL, echo=settings.DEBUG)
@@ -41,6 +95,45 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# ====================
+# Async engine (asyncpg / aiosqlite)
+# ====================
+# Used by the hot read routes via get_async_db. The sync engine above stays the
+# path for Celery, scripts and every other route.
+_async_engine = None
+AsyncSessionLocal = None
+
+
+def _async_engine_args():
+    """Translate DATABASE_URL and its driver options into their async equivalents"""
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite"), {}
+    if url.get_backend_name() == "postgresql":
+        # asyncpg takes ssl=... instead of libpq's sslmode
+        ssl_mode = url.query.get("sslmode") or ("require" if not settings.DEBUG else "prefer")
+        url = url.set(drivername="postgresql+asyncpg").difference_update_query(["sslmode"])
+        return url, {
+            "poolclass": InstrumentedAsyncAdaptedQueuePool,
+            "connect_args": {"ssl": ssl_mode},
+            **settings.db_pool_options,
+        }
+    return url, {}
+
+
+def get_async_engine():
+    """Create the async engine on first use so the driver is only required where it is used"""
+    global _async_engine, AsyncSessionLocal
+    if _async_engine is None:
+        url, kwargs = _async_engine_args()
+        _async_engine = create_async_engine(url, echo=settings.DEBUG, **kwargs)
+        _instrument_engine(_async_engine.sync_engine)
+        AsyncSessionLocal = async_sessionmaker(
+            bind=_async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
 def get_db():
     """
     Dependency to get database session
@@ -54,6 +147,28 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Async dependency to get database session
+    Yields an AsyncSession and ensures it's closed after use
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """
+    Short-lived AsyncSession for code that outlives a request, e.g. WebSocket handlers.
+    A connection is only checked out once the session runs a query and is returned
+    when the block exits.
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_db_session():
     """
     Utility to create a new Session for use in Celery tasks or other contexts.
@@ -67,6 +182,72 @@ def get_db_session():
         db.close()
 
 
+def _pool_stats(pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        # SQLite and other non-queue pools: no sizing to report
+        return {"pool_class": type(pool).__name__, "status": pool.status()}
+    stats = {
+        "pool_class": type(pool).__name__,
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "timeout_seconds": pool.timeout(),
+        "recycle_seconds": pool._recycle,
+        "pre_ping": pool._pre_ping,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # QueuePool.overflow() counts from -pool_size until the pool is full
+        "overflow_in_use": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, _InstrumentedPoolMixin):
+        stats.update(pool.metrics.snapshot())
+    return stats
+
+
+def get_pool_stats() -> dict:
+    """Snapshot of the sync and (if created) async connection pools for this worker"""
+    return {
+        "profile": settings.DB_POOL_PROFILE,
+        "sync": _pool_stats(engine.pool),
+        "async": _pool_stats(_async_engine.sync_engine.pool) if _async_engine is not None else None,
+    }
+
+
+def _pool_prometheus_lines() -> list[str]:
+    pools = [("sync", engine.pool)]
+    if _async_engine is not None:
+        pools.append(("async", _async_engine.sync_engine.pool))
+    pools = [(name, pool) for name, pool in pools if isinstance(pool, _InstrumentedPoolMixin)]
+    if not pools:
+        return []
+
+    lines = [
+        "# HELP clockko_db_pool_checked_out Connections currently checked out of the pool",
+        "# TYPE clockko_db_pool_checked_out gauge",
+    ]
+    lines += [f'clockko_db_pool_checked_out{{pool="{name}"}} {pool.checkedout()}' for name, pool in pools]
+    lines += [
+        "# HELP clockko_db_pool_overflow_in_use Overflow connections currently open beyond pool_size",
+        "# TYPE clockko_db_pool_overflow_in_use gauge",
+    ]
+    lines += [f'clockko_db_pool_overflow_in_use{{pool="{name}"}} {max(pool.overflow(), 0)}' for name, pool in pools]
+    for metric, attribute, help_text in (
+        ("clockko_db_pool_checkout_timeouts_total", "checkout_timeouts", "Checkouts that gave up after pool_timeout"),
+        ("clockko_db_pool_invalidations_total", "invalidations", "Connections invalidated (e.g. disconnects)"),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{pool="{name}"}} {getattr(pool.metrics, attribute)}' for name, pool in pools]
+    lines += [
+        "# HELP clockko_db_pool_checkout_wait_seconds Time spent waiting for a pooled connection",
+        "# TYPE clockko_db_pool_checkout_wait_seconds histogram",
+    ]
+    for name, pool in pools:
+        lines += pool.metrics.checkout_wait.prometheus_lines("clockko_db_pool_checkout_wait_seconds", {"pool": name})
+    return lines
+
+
+register_collector(_pool_prometheus_lines)
+
+
 def get_database_type():
     """
     Helper function to determine which database is being used
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+from fastapi import Depends, Header, HTTPException, Request
+
+from app.core.auth import get_current_user_cached
+from app.core.config import settings
+from app.core.user_cache import CachedUser
+
+# Longest Idempotency-Key accepted (clients normally send a UUID)
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyStore:
+    """Thread-safe LRU+TTL store of responses keyed by (user id, Idempotency-Key).
+
+    A retried request with the same key gets the stored response back without
+    running the handler (and without touching the database). Only successful
+    responses are stored, so a failed request can simply be retried.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        # (user_id, key) -> (request fingerprint, response)
+        self._responses: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: set = set()
+        self._lock = threading.Lock()
+        self.replays = 0
+        self.stored = 0
+
+    def run(self, user_id: UUID, key: str, fingerprint: str, call: Callable[[], Any]) -> Any:
+        cache_key = (user_id, key)
+        with self._lock:
+            stored = self._responses.get(cache_key)
+            if stored is not None:
+                if stored[0] != fingerprint:
+                    raise HTTPException(
+                        status_code=422, detail="Idempotency-Key was already used for a different request"
+                    )
+                self.replays += 1
+                return stored[1]
+            if cache_key in self._in_flight:
+                raise HTTPException(
+                    status_code=409, detail="A request with this Idempotency-Key is still being processed"
+                )
+            self._in_flight.add(cache_key)
+
+        try:
+            response = call()
+        except BaseException:
+            with self._lock:
+                self._in_flight.discard(cache_key)
+            raise
+
+        with self._lock:
+            self._responses[cache_key] = (fingerprint, response)
+            self._in_flight.discard(cache_key)
+            self.stored += 1
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._responses.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._responses),
+                "maxsize": self._responses.maxsize,
+                "ttl_seconds": self._responses.ttl,
+                "in_flight": len(self._in_flight),
+                "stored": self.stored,
+                "replays": self.replays,
+            }
+
+
+# Global store instance (per worker process)
+idempotency_store = IdempotencyStore(
+    maxsize=settings.IDEMPOTENCY_CACHE_MAX_SIZE, ttl=settings.IDEMPOTENCY_TTL_SECONDS
+)
+
+
+class Idempotency:
+    """Per-request handle returned by the idempotency dependency"""
+
+    def __init__(self, user_id: UUID, key: Optional[str], fingerprint: str):
+        self.user_id = user_id
+        self.key = key
+        self.fingerprint = fingerprint
+
+    def run(self, call: Callable[[], Any]) -> Any:
+        """Run the handler, or replay its stored response for a repeated Idempotency-Key"""
+        if self.key is None:
+            return call()
+        return idempotency_store.run(self.user_id, self.key, self.fingerprint, call)
+
+
+async def get_idempotency(
+    request: Request,
+    user: CachedUser = Depends(get_current_user_cached),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+) -> Idempotency:
+    """
+    Dependency for retry-safe POST routes: honours an optional Idempotency-Key header.
+    The key is bound to the method, path and body it was first used with.
+    """
+    if idempotency_key is None:
+        return Idempotency(user.id, None, "")
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return Idempotency(user.id, idempotency_key, digest.hexdigest())
@@ -0,0 +1,132 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is emitted as a field
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+access_logger = logging.getLogger("clockko.access")
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    """Fields passed through `extra=` (method, path, status, duration_ms, ...)"""
+    return {
+        key: value for key, value in record.__dict__.items()
+        if key not in _RESERVED_ATTRS and not key.startswith("_")
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message plus any `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(_extra_fields(record))
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable line for local development, with the `extra=` fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = " ".join(f"{key}={value}" for key, value in _extra_fields(record).items())
+        if not extra:
+            return line
+        # Keep the fields on the first line when a traceback follows
+        first, newline, rest = line.partition("\n")
+        return f"{first} {extra}{newline}{rest}"
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records without formatting them; rendering and I/O happen on the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merge args now: they may be mutable objects that change before the listener runs
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """Route all application and uvicorn logging through a queue drained by a background thread.
+
+    Request handlers only pay for a queue put; formatting and stdout writes happen on the
+    QueueListener thread. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(TextFormatter())
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    root = logging.getLogger()
+    root.handlers = [_QueueHandler(log_queue)]
+    # DEBUG traces are only enabled for our own loggers; third-party libraries stay at INFO
+    level = logging.getLevelName(settings.LOG_LEVEL)
+    if not isinstance(level, int):
+        # getLevelName returns "Level X" for unknown names
+        root.setLevel(logging.INFO)
+        logging.getLogger(__name__).warning("Unknown LOG_LEVEL %r, using INFO", settings.LOG_LEVEL)
+        level = logging.INFO
+    root.setLevel(max(level, logging.INFO))
+    for name in ("app", "clockko"):
+        logging.getLogger(name).setLevel(level)
+
+    # Uvicorn installs its own stdout handlers before importing the app; send its logs through
+    # the queue too. Its per-request access log is replaced by the sampled clockko.access logger.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def should_log_access(status_code: int) -> bool:
+    """Always keep server errors; sample everything else at ACCESS_LOG_SAMPLE_RATE"""
+    if status_code >= 500:
+        return True
+    return random.random() < settings.ACCESS_LOG_SAMPLE_RATE
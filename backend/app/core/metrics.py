@@ -0,0 +1,253 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Seconds spent waiting for a pooled connection
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Seconds from request start to the end of the response
+REQUEST_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# SQL statements executed while serving one request
+DB_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Seconds spent inside cursor.execute while serving one request
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram with cumulative (Prometheus-style) bucket counts"""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(sorted(buckets))
+        # One slot per upper bound plus the +Inf overflow slot
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = count
+        return {"buckets": buckets, "sum": round(total, 6), "count": count}
+
+    def prometheus_lines(self, name: str, labels: dict) -> list[str]:
+        snapshot = self.snapshot()
+        lines = [
+            f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}"
+            for bound, count in snapshot["buckets"].items()
+        ]
+        lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+        return lines
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+class PoolMetrics:
+    """Checkout wait times and lifecycle counters for one connection pool"""
+
+    def __init__(self):
+        self.checkout_wait = Histogram(CHECKOUT_WAIT_BUCKETS)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def record_checkout(self, waited: float) -> None:
+        self.checkout_wait.observe(waited)
+        with self._lock:
+            self.checkouts += 1
+
+    def record_timeout(self, waited: float) -> None:
+        self.checkout_wait.observe(waited)
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+            }
+        counters["checkout_wait_seconds"] = self.checkout_wait.snapshot()
+        return counters
+
+
+class RequestMetrics:
+    """Per-route latency and DB usage histograms plus the in-flight request gauge"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency: dict[tuple[str, str, str], Histogram] = {}
+        self.db_queries: dict[tuple[str, str], Histogram] = {}
+        self.db_time: dict[tuple[str, str], Histogram] = {}
+
+    @staticmethod
+    def _histogram(family: dict, key: tuple, buckets: tuple) -> Histogram:
+        histogram = family.get(key)
+        if histogram is None:
+            histogram = family.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float,
+                         db_queries: int, db_seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            latency = self._histogram(self.latency, (method, route, str(status)), REQUEST_LATENCY_BUCKETS)
+            queries = self._histogram(self.db_queries, (method, route), DB_QUERY_COUNT_BUCKETS)
+            db_time = self._histogram(self.db_time, (method, route), DB_TIME_BUCKETS)
+        latency.observe(seconds)
+        queries.observe(db_queries)
+        db_time.observe(db_seconds)
+
+    def prometheus_lines(self) -> list[str]:
+        with self._lock:
+            in_flight = self.in_flight
+            latency = list(self.latency.items())
+            db_queries = list(self.db_queries.items())
+            db_time = list(self.db_time.items())
+
+        lines = [
+            "# HELP clockko_http_requests_in_flight HTTP requests currently being served",
+            "# TYPE clockko_http_requests_in_flight gauge",
+            f"clockko_http_requests_in_flight {in_flight}",
+            "# HELP clockko_http_request_duration_seconds HTTP request latency by route template",
+            "# TYPE clockko_http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in latency:
+            lines += histogram.prometheus_lines(
+                "clockko_http_request_duration_seconds", {"method": method, "route": route, "status": status}
+            )
+        lines += [
+            "# HELP clockko_http_request_db_queries SQL statements executed per HTTP request",
+            "# TYPE clockko_http_request_db_queries histogram",
+        ]
+        for (method, route), histogram in db_queries:
+            lines += histogram.prometheus_lines("clockko_http_request_db_queries", {"method": method, "route": route})
+        lines += [
+            "# HELP clockko_http_request_db_seconds Time spent executing SQL per HTTP request",
+            "# TYPE clockko_http_request_db_seconds histogram",
+        ]
+        for (method, route), histogram in db_time:
+            lines += histogram.prometheus_lines("clockko_http_request_db_seconds", {"method": method, "route": route})
+        return lines
+
+
+# Global request metrics (per worker process)
+request_metrics = RequestMetrics()
+
+# [query count, seconds] for the request being served; None outside a request
+_request_db_stats: ContextVar[Optional[list]] = ContextVar("request_db_stats", default=None)
+
+_collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[str]]) -> None:
+    """Add a callable returning extra Prometheus exposition lines (e.g. pool metrics)"""
+    _collectors.append(collector)
+
+
+def render_prometheus() -> str:
+    lines = request_metrics.prometheus_lines()
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_db_stats.get()
+    started = conn.info.pop("query_started", None)
+    if stats is not None and started is not None:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+
+
+def install_query_hooks() -> None:
+    """Attribute SQL statement count and time to the current request, for every engine (sync and async)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and DB usage per route template.
+
+    Labels use the matched route's path template (e.g. /api/tasks/{task_id}) so raw
+    URLs never create new series; requests that match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+        request_metrics.request_started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_metrics.request_finished(
+                scope["method"], route, status_code, elapsed, db_stats[0], db_stats[1]
+            )
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID, uuid4
+from cachetools import TTLCache
+from app.core.config import settings
+from app.services.ws_backplane import Backplane, create_backplane
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Slim projection of User served by get_current_user_cached.
+
+    Only carries what authenticated routes need to authorize a request. Routes
+    that read or modify other user fields must keep using get_current_user.
+    """
+    id: UUID
+    is_active: bool
+    is_verified: bool
+    onboarding_completed: bool
+
+
+class UserCache:
+    """Thread-safe LRU+TTL cache of CachedUser keyed by user id, with hit/miss counters.
+
+    Invalidations are published on the backplane so the other workers drop the user
+    as well; the TTL bounds staleness should an invalidation be lost.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, backplane: Backplane = None):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.backplane = backplane or create_backplane(settings.USER_CACHE_CHANNEL)
+        self.node_id = uuid4().hex
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.remote_invalidations = 0
+
+    async def start(self) -> None:
+        """Subscribe to invalidations from other workers (application startup)"""
+        self._loop = asyncio.get_running_loop()
+        await self.backplane.start(self.node_id, self._on_backplane_message)
+
+    async def stop(self) -> None:
+        if self._loop is not None:
+            await self.backplane.stop(self.node_id)
+            self._loop = None
+
+    def get(self, user_id: UUID) -> CachedUser | None:
+        with self._lock:
+            user = self._cache.get(user_id)
+            if user is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return user
+
+    def set(self, user: CachedUser) -> None:
+        with self._lock:
+            self._cache[user.id] = user
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop a user here and on every other worker after a profile update,
+        verification change or account deletion.
+
+        Safe to call from the event loop and from threadpool routes alike.
+        """
+        self._drop(user_id)
+        if self._loop is not None:
+            envelope = {"kind": "user-invalidate", "user_ids": [str(user_id)]}
+            asyncio.run_coroutine_threadsafe(self.backplane.publish(self.node_id, envelope), self._loop)
+
+    def _drop(self, user_id) -> None:
+        if not isinstance(user_id, UUID):
+            user_id = UUID(str(user_id))
+        with self._lock:
+            self._cache.pop(user_id, None)
+            self.invalidations += 1
+
+    async def _on_backplane_message(self, envelope: dict) -> None:
+        if envelope.get("kind") != "user-invalidate":
+            logger.warning("Unknown user cache message kind: %s", envelope.get("kind"))
+            return
+        self.remote_invalidations += len(envelope["user_ids"])
+        for user_id in envelope["user_ids"]:
+            self._drop(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl_seconds": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "remote_invalidations": self.remote_invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "backplane": self.backplane.name,
+            }
+
+
+# Global cache instance (per worker process, kept coherent through the backplane)
+user_cache = UserCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
@@ -1,6 +1,7 @@
-from fastapi import FastAPI, Query, Request
+from fastapi import Depends, FastAPI, Query, Request
 from fastapi.responses import JSONResponse
 import os
+import time
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import (
@@ -14,12 +15,23 @@ from app.api import (
     two_factor_auth,
     challenges,
     websocket,
+    internal,
 )
 from fastapi import HTTPException
-from fastapi.responses import Response
+from fastapi.responses import PlainTextResponse, Response
 from app.api import auth_google  # Google ID token verification endpoints
+from app.core.auth import require_internal_access
 from app.core.config import settings, get_secret
 from app.core.database import Base, engine
+from app.core.logging_config import access_logger, setup_logging, should_log_access
+from app.core.metrics import RequestMetricsMiddleware, install_query_hooks, render_prometheus
+from app.core.user_cache import user_cache
+from app.services.participant_reaper import participant_reaper
+from app.services.session_cache import session_cache
+from app.services.websocket_manager import websocket_manager
+
+# Queue-based logging: handlers only enqueue, a background thread formats and writes
+setup_logging()
 
 # Create all tables (if using without Alembic migrations)
 Base.metadata.create_all(bind=engine)
@@ -37,9 +49,22 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         import logging
         logging.getLogger("uvicorn.error").error(f"Error checking GOOGLE_CLIENT_ID: {e}")
+
+    # Join the WebSocket backplane so room events reach sockets held by other workers
+    await websocket_manager.start()
+    # Close participations whose client vanished without calling /leave
+    participant_reaper.start()
+    # Hear current-session cache invalidations published by other workers
+    await session_cache.start()
+    # Hear authenticated-user cache invalidations published by other workers
+    await user_cache.start()
     
     yield
     # Shutdown
+    await user_cache.stop()
+    await session_cache.stop()
+    await participant_reaper.stop()
+    await websocket_manager.stop()
 
 
 app = FastAPI(
@@ -67,17 +92,15 @@ if frontend_url:
 # Remove duplicates
 origins = list(set(origins))
 
-print("🌐 CORS allowed origins:", origins)
-
 # Fallback: allow all origins in production to debug CORS issues
 # This is temporary for debugging - should be restricted in production
 import logging
 logger = logging.getLogger(__name__)
+logger.info("CORS allowed origins: %s", origins)
 
 def log_cors_request(origin: str):
     """Log all CORS requests for debugging"""
-    logger.info(f"🌐 CORS Request from origin: {origin}")
-    print(f"🌐 CORS Request from origin: {origin}")
+    logger.debug("CORS request from origin: %s", origin)
 
 # More permissive CORS for debugging production issues
 allow_credentials = True
@@ -86,29 +109,40 @@ app.add_middleware(
     allow_origins=["*"],  # Temporarily allow all origins for debugging
     allow_credentials=False,  # Set to False when allow_origins is "*"
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Leaderboard pagination cursor
 )
 
-# Add logging middleware to debug CORS requests
+# Access log: one structured line per request, sampled (server errors are always kept)
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all requests for debugging"""
-    origin = request.headers.get("origin", "No Origin")
-    method = request.method
-    url = str(request.url)
-    
-    logger.info(f"📨 {method} {url} from origin: {origin}")
-    print(f"📨 {method} {url} from origin: {origin}")
-    
+    """Log method, path, status, duration and origin of sampled requests"""
+    started = time.perf_counter()
     try:
         response = await call_next(request)
-        logger.info(f"📤 Response status: {response.status_code}")
-        print(f"📤 Response status: {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f"💥 Request failed: {str(e)}")
-        print(f"💥 Request failed: {str(e)}")
+    except Exception:
+        access_logger.exception("request failed", extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": 500,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "origin": request.headers.get("origin"),
+        })
         raise
+    if should_log_access(response.status_code):
+        access_logger.info("request", extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "origin": request.headers.get("origin"),
+        })
+    return response
+
+# Latency / DB usage histograms per route template, exported at /metrics.
+# Added last so it is the outermost middleware and times the whole stack.
+install_query_hooks()
+app.add_middleware(RequestMetricsMiddleware)
 
 # Custom exception handler to ensure CORS headers on all responses
 @app.exception_handler(Exception)
@@ -150,6 +184,7 @@ app.include_router(user_settings.router)  # Has its own prefix /api/users
 app.include_router(two_factor_auth.router, prefix="/api/auth", tags=["Two-Factor Authentication"])
 app.include_router(challenges.router, prefix="/api/challenges", tags=["challenges"])
 app.include_router(websocket.router, prefix="/api", tags=["websocket"])
+app.include_router(internal.router)  # Has its own prefix /internal/metrics
 
 # If you have a reminder thread, import and start it here
 # from app.reminders import start_reminder_thread
@@ -160,7 +195,7 @@ app.include_router(websocket.router, prefix="/api", tags=["websocket"])
 async def options_handler(path: str, request: Request):
     """Handle CORS preflight requests manually"""
     origin = request.headers.get("origin", "*")
-    logger.info(f"🔧 CORS preflight for path: /{path} from origin: {origin}")
+    logger.debug("CORS preflight for path: /%s from origin: %s", path, origin)
     
     response = Response()
     response.headers["Access-Control-Allow-Origin"] = "*"
@@ -200,6 +235,12 @@ def api_health():
     return {"status": "ok", "service": "clockko-api", "version": app.version}
 
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_internal_access)])
+def metrics():
+    """Prometheus exposition of request latency, per-request DB usage and pool metrics (per worker)"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health/google")
 def google_health():
     # Prefer the in-memory setting, but if empty, attempt to read from Secrets Manager
@@ -5,6 +5,7 @@ from app.models.user_settings import UserSettings
 from app.models.coworking import RoomParticipant, RoomMessage, RoomStatus, RoomMessageType
 from app.models.shutdown_reflection import ShutdownReflection
 from app.models.room import CoworkingRoom
+from app.models.daily_focus_rollup import DailyFocusRollup
 
 __all__ = [
     "User",
@@ -16,4 +17,5 @@ __all__ = [
     "RoomMessage",
     "RoomMessageType",
     "ShutdownReflection",
+    "DailyFocusRollup",
 ]
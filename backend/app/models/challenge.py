@@ -7,9 +7,11 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     DateTime,
+    Date,
     func,
     Enum,
     UniqueConstraint,
+    Index,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -69,10 +71,20 @@ class UserChallengeStats(Base):
     __tablename__ = "user_challenge_stats"
 
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
-    total_points = Column(Integer, default=0)
+    total_points = Column(Integer, default=0, server_default="0", nullable=False)
     challenges_completed = Column(Integer, default=0)
     weekly_points = Column(Integer, default=0)
     current_shutdown_streak = Column(Integer, default=0)
+    # Day of the most recent shutdown reflection; the streak only counts if this is today
+    last_shutdown_date = Column(Date, nullable=True)
     updated_at = Column(DateTime, onupdate=func.now())
 
     user = relationship("User", back_populates="challenge_stats")
+
+
+# Leaderboard keyset order: total_points DESC, user_id ASC
+Index(
+    "idx_user_challenge_stats_points",
+    UserChallengeStats.total_points.desc(),
+    UserChallengeStats.user_id,
+)
@@ -51,6 +51,8 @@ class RoomParticipant(Base):
     is_muted = Column(Boolean, default=True)
     is_speaking = Column(Boolean, default=False)
     left_at = Column(DateTime, nullable=True)
+    # Last heartbeat seen on one of the user's room WebSockets; NULL until they connect one
+    last_seen_at = Column(DateTime, nullable=True)
 
     room = relationship("CoworkingRoom", back_populates="participants")
     user = relationship("User")
@@ -71,4 +73,24 @@ class RoomMessage(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     room = relationship("CoworkingRoom", back_populates="messages")
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+    # Return created_at from the INSERT itself so messages can be published without a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+
+# Message history keyset order: newest first per room, id breaks created_at ties
+Index(
+    "idx_room_message_room_created",
+    RoomMessage.room_id,
+    RoomMessage.created_at.desc(),
+    RoomMessage.id.desc(),
+)
+
+# Stale-participant reaper scan: only active participations that have heartbeated
+Index(
+    "idx_room_participant_last_seen",
+    RoomParticipant.last_seen_at,
+    postgresql_where=RoomParticipant.left_at.is_(None),
+    sqlite_where=RoomParticipant.left_at.is_(None),
+)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class DailyFocusRollup(Base):
+    """Per-user, per-day totals of completed focus/break sessions.
+
+    Maintained incrementally by timetrackerservice when a session ends, so the
+    daily summary is a single primary-key lookup instead of a scan of time_sessions.
+    The date is the UTC date of the session's start_time.
+    """
+    __tablename__ = "daily_focus_rollups"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    focus_seconds = Column(Integer, nullable=False, default=0)
+    break_seconds = Column(Integer, nullable=False, default=0)
+    # Number of completed focus sessions that day
+    session_count = Column(Integer, nullable=False, default=0)
@@ -23,6 +23,8 @@ class CoworkingRoom(Base):
     description = Column(Text, nullable=True)
     status = Column(Enum(RoomStatus), nullable=False, default=RoomStatus.active)
     max_participants = Column(Integer, default=10, nullable=False)
+    # Active (not yet left) participants, maintained atomically by join/leave for capacity checks
+    current_participants = Column(Integer, default=0, server_default="0", nullable=False)
     color = Column(String(50), nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
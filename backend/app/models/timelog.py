@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
@@ -7,6 +7,17 @@ import uuid
 
 class Timelog(Base):
     __tablename__ = 'time_sessions'
+    __table_args__ = (
+        # Per-user history and day-range scans
+        Index('idx_time_sessions_user_start', 'user_id', 'start_time'),
+        # Open sessions only: current session, clock-out and active-break lookups
+        Index(
+            'idx_time_sessions_open',
+            'user_id', 'type', 'start_time',
+            postgresql_where=text('end_time IS NULL'),
+            sqlite_where=text('end_time IS NULL'),
+        ),
+    )
 
     session_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
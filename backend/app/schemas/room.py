@@ -66,7 +66,8 @@ class CoworkingRoomDetail(BaseModel):
     name: str
     description: Optional[str]
     participants: List[RoomParticipantResponse]
-    messages: List[RoomMessageResponse]
+    # History is served by GET /coworking/rooms/{room_id}/messages; kept empty for older clients
+    messages: List[RoomMessageResponse] = []
     tasks_completed: int = 0
     tasks_total: int = 0
     focus_time: int = 0
@@ -1,10 +1,16 @@
-from sqlalchemy.orm import Session
+import base64
+import threading
+import time
+from dataclasses import dataclass
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, aliased
 from uuid import UUID
 from app.models.challenge import Challenge, ChallengeParticipant, UserChallengeStats
 from app.models.user import User
 from app.schemas.challenge import WeeklyChallenge, LeaderboardUser
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException
+from app.core.config import settings
 
 def get_user_stats(db: Session, user_id: UUID) -> UserChallengeStats:
     stats = db.query(UserChallengeStats).filter(UserChallengeStats.user_id == user_id).first()
@@ -16,22 +22,33 @@ def get_user_stats(db: Session, user_id: UUID) -> UserChallengeStats:
     return stats
 
 def get_weekly_challenges(db: Session, user_id: UUID) -> List[WeeklyChallenge]:
-    active_challenges = db.query(Challenge).filter(Challenge.is_active == True).all()
-    
+    # One round trip regardless of how many challenges are active: participant counts
+    # come from a grouped subquery and the user's own row from a filtered outer join
+    participant_counts = db.query(
+        ChallengeParticipant.challenge_id,
+        func.count(ChallengeParticipant.id).label("joined_count")
+    ).group_by(ChallengeParticipant.challenge_id).subquery()
+    user_participation = aliased(ChallengeParticipant)
+
+    rows = db.query(
+        Challenge,
+        func.coalesce(participant_counts.c.joined_count, 0),
+        user_participation.progress,
+        user_participation.status,
+    ).outerjoin(
+        participant_counts, participant_counts.c.challenge_id == Challenge.id
+    ).outerjoin(
+        user_participation,
+        and_(user_participation.challenge_id == Challenge.id, user_participation.user_id == user_id)
+    ).filter(Challenge.is_active == True).all()
+
     weekly_challenges = []
-    for challenge in active_challenges:
-        participant_count = db.query(ChallengeParticipant).filter(ChallengeParticipant.challenge_id == challenge.id).count()
-        
-        user_participation = db.query(ChallengeParticipant).filter(
-            ChallengeParticipant.challenge_id == challenge.id,
-            ChallengeParticipant.user_id == user_id
-        ).first()
-        
+    for challenge, participant_count, user_progress, user_status in rows:
         progress = 0
         status = "not_joined"
-        if user_participation:
-            progress = user_participation.progress
-            status = user_participation.status.value
+        if user_status is not None:
+            progress = user_progress
+            status = user_status.value
             
         weekly_challenges.append(
             WeeklyChallenge(
@@ -50,29 +67,171 @@ def get_weekly_challenges(db: Session, user_id: UUID) -> List[WeeklyChallenge]:
         
     return weekly_challenges
 
-def get_leaderboard(db: Session, current_user_id: UUID) -> List[LeaderboardUser]:
-    leaderboard_data = db.query(
-        User,
-        UserChallengeStats.total_points
-    ).join(
-        UserChallengeStats, User.id == UserChallengeStats.user_id
-    ).order_by(
-        UserChallengeStats.total_points.desc()
-    ).all()
-    
-    leaderboard = []
-    for rank, (user, total_points) in enumerate(leaderboard_data, start=1):
-        leaderboard.append(
-            LeaderboardUser(
-                rank=rank,
-                name=user.full_name or user.username,
-                avatar=user.avatar_url,
-                points=total_points,
-                is_current_user=(user.id == current_user_id)
-            )
-        )
-        
-    return leaderboard
+# ====================
+# Leaderboard
+# ====================
+# Order is total_points DESC, user_id ASC (idx_user_challenge_stats_points). Ranks use
+# competition ranking: 1 + number of users with strictly more points, so ties share a rank.
+LEADERBOARD_TOP_N = 100
+LEADERBOARD_MAX_LIMIT = 100
+
+
+@dataclass(frozen=True)
+class _LeaderRow:
+    user_id: UUID
+    points: int
+    name: str
+    avatar: Optional[str]
+    position: int  # 1-based position in leaderboard order
+    rank: int
+
+
+_top_snapshot: List[_LeaderRow] = []
+# Whether anyone ranks below the snapshot (read as one extra row)
+_top_snapshot_has_more = False
+_top_snapshot_expires_at = 0.0
+_top_snapshot_lock = threading.Lock()
+
+
+def _leaderboard_query(db: Session):
+    return db.query(
+        UserChallengeStats.user_id,
+        UserChallengeStats.total_points,
+        User.full_name,
+        User.username,
+        User.avatar_url,
+    ).join(User, User.id == UserChallengeStats.user_id)
+
+
+def _rows_after(db: Session, points: Optional[int], user_id: Optional[UUID], limit: int):
+    """Keyset page: the `limit` rows that follow (points, user_id) in leaderboard order"""
+    query = _leaderboard_query(db)
+    if points is not None:
+        query = query.filter(or_(
+            UserChallengeStats.total_points < points,
+            and_(UserChallengeStats.total_points == points, UserChallengeStats.user_id > user_id),
+        ))
+    return query.order_by(
+        UserChallengeStats.total_points.desc(), UserChallengeStats.user_id.asc()
+    ).limit(limit).all()
+
+
+def _ranked(rows, position: int, prev_points: Optional[int], prev_rank: int) -> List[_LeaderRow]:
+    """Number rows that directly follow a row at `position` with (prev_points, prev_rank).
+
+    In leaderboard order the first user with a given score sits at position
+    1 + (users with more points), so a row's rank is its position unless it ties
+    with the row before it.
+    """
+    ranked = []
+    for user_id, points, full_name, username, avatar in rows:
+        position += 1
+        rank = prev_rank if points == prev_points else position
+        ranked.append(_LeaderRow(user_id, points, full_name or username, avatar, position, rank))
+        prev_points, prev_rank = points, rank
+    return ranked
+
+
+def _encode_cursor(row: _LeaderRow) -> str:
+    raw = f"{row.points}:{row.user_id}:{row.position}:{row.rank}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, UUID, int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        points, user_id, position, rank = raw.split(":")
+        return int(points), UUID(user_id), int(position), int(rank)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid leaderboard cursor")
+
+
+def _top_leaders(db: Session) -> tuple[List[_LeaderRow], bool]:
+    """Top-N snapshot shared by all requests in this worker, rebuilt every LEADERBOARD_CACHE_TTL_SECONDS.
+
+    Returns the rows and whether more users rank below them.
+    """
+    global _top_snapshot, _top_snapshot_has_more, _top_snapshot_expires_at
+    if time.monotonic() < _top_snapshot_expires_at:
+        return _top_snapshot, _top_snapshot_has_more
+    with _top_snapshot_lock:
+        # Another thread may have refreshed it while we waited for the lock
+        if time.monotonic() >= _top_snapshot_expires_at:
+            rows = _rows_after(db, None, None, LEADERBOARD_TOP_N + 1)
+            _top_snapshot = _ranked(rows[:LEADERBOARD_TOP_N], 0, None, 0)
+            _top_snapshot_has_more = len(rows) > LEADERBOARD_TOP_N
+            _top_snapshot_expires_at = time.monotonic() + settings.LEADERBOARD_CACHE_TTL_SECONDS
+        return _top_snapshot, _top_snapshot_has_more
+
+
+def _to_leaderboard_user(row: _LeaderRow, current_user_id: UUID) -> LeaderboardUser:
+    return LeaderboardUser(
+        rank=row.rank,
+        name=row.name,
+        avatar=row.avatar,
+        points=row.points,
+        is_current_user=(row.user_id == current_user_id)
+    )
+
+
+def get_leaderboard(db: Session, current_user_id: UUID, cursor: Optional[str] = None,
+                    limit: int = LEADERBOARD_TOP_N) -> tuple[List[LeaderboardUser], Optional[str]]:
+    """One page of the leaderboard and the cursor for the next page (None on the last page).
+
+    The first page is served from the cached top-N snapshot; later pages are keyset
+    queries on idx_user_challenge_stats_points.
+    """
+    limit = max(1, min(limit, LEADERBOARD_MAX_LIMIT))
+    if cursor is None:
+        top, more_below = _top_leaders(db)
+        page = top[:limit]
+        has_more = len(top) > limit or more_below
+    else:
+        points, user_id, position, rank = _decode_cursor(cursor)
+        rows = _rows_after(db, points, user_id, limit + 1)
+        page = _ranked(rows[:limit], position, points, rank)
+        has_more = len(rows) > limit
+
+    next_cursor = _encode_cursor(page[-1]) if has_more and page else None
+    return [_to_leaderboard_user(row, current_user_id) for row in page], next_cursor
+
+
+def get_leaderboard_around_user(db: Session, user_id: UUID, window: int = 5) -> List[LeaderboardUser]:
+    """The user's own leaderboard row with up to `window` neighbours on each side"""
+    me = _leaderboard_query(db).filter(UserChallengeStats.user_id == user_id).first()
+    if not me:
+        return []
+    my_points = me.total_points
+
+    # Rank from a single COUNT over the total_points index; ties ahead of us only shift position
+    my_rank = 1 + db.query(func.count(UserChallengeStats.user_id)).filter(
+        UserChallengeStats.total_points > my_points
+    ).scalar()
+    tied_ahead = db.query(func.count(UserChallengeStats.user_id)).filter(
+        UserChallengeStats.total_points == my_points,
+        UserChallengeStats.user_id < user_id
+    ).scalar()
+    my_position = my_rank + tied_ahead
+
+    above = _leaderboard_query(db).filter(or_(
+        UserChallengeStats.total_points > my_points,
+        and_(UserChallengeStats.total_points == my_points, UserChallengeStats.user_id < user_id),
+    )).order_by(
+        UserChallengeStats.total_points.asc(), UserChallengeStats.user_id.desc()
+    ).limit(window).all()
+    above.reverse()
+    below = _rows_after(db, my_points, user_id, window)
+
+    rows = above + [me] + below
+    top_points = rows[0].total_points
+    if top_points == my_points:
+        top_rank = my_rank
+    else:
+        top_rank = 1 + db.query(func.count(UserChallengeStats.user_id)).filter(
+            UserChallengeStats.total_points > top_points
+        ).scalar()
+    ranked = _ranked(rows, my_position - len(above) - 1, top_points, top_rank)
+    return [_to_leaderboard_user(row, user_id) for row in ranked]
 
 def join_challenge(db: Session, challenge_id: UUID, user_id: UUID):
     challenge = db.query(Challenge).filter(Challenge.id == challenge_id, Challenge.is_active == True).first()
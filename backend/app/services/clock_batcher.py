@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import List, Set, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.database import async_session_scope
+from app.models.timelog import Timelog
+from app.services import timetrackerservice
+
+logger = logging.getLogger(__name__)
+
+CLOCK_IN = "in"
+CLOCK_OUT = "out"
+
+
+class ClockEventBatcher:
+    """Coalesces concurrent clock-in/clock-out requests into one transaction.
+
+    At the start and end of the working day thousands of users clock in or out
+    within seconds. Events arriving within CLOCK_BATCH_WINDOW_SECONDS of the first
+    pending one are written together: one UPDATE for the clock-outs, one SELECT and
+    one multi-row INSERT for the clock-ins, one commit. Each request still gets its
+    own session back (or a 404 for a clock-out without an open session). Batches
+    are written one at a time, in arrival order.
+    """
+
+    def __init__(self, window_seconds: float, max_batch: int):
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, UUID, asyncio.Future]] = []
+        self._tasks: Set[asyncio.Task] = set()
+        # One batch transaction at a time keeps a user's clock-in and clock-out ordered
+        self._write_lock = asyncio.Lock()
+        self.batches = 0
+        self.events = 0
+
+    async def clock_in(self, user_id: UUID) -> Timelog:
+        return await self._submit(CLOCK_IN, user_id)
+
+    async def clock_out(self, user_id: UUID) -> Timelog:
+        return await self._submit(CLOCK_OUT, user_id)
+
+    async def _submit(self, kind: str, user_id: UUID) -> Timelog:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((kind, user_id, future))
+        if len(self._pending) == self.max_batch:
+            # Only when the limit is first reached; each flush reschedules itself for any overflow
+            self._schedule(0)
+        elif len(self._pending) == 1:
+            self._schedule(self.window_seconds)
+        return await future
+
+    def _schedule(self, delay: float) -> None:
+        task = asyncio.get_running_loop().create_task(self._flush_later(delay))
+        # Keep a reference so the task is not garbage collected before it runs
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if not batch:
+            return
+        if self._pending:
+            self._schedule(0)
+
+        async with self._write_lock:
+            for group in _split_conflicts(batch):
+                await self._write(group)
+
+    async def _write(self, events: List[Tuple[str, UUID, asyncio.Future]]) -> None:
+        clock_ins = {user_id for kind, user_id, _ in events if kind == CLOCK_IN}
+        clock_outs = {user_id for kind, user_id, _ in events if kind == CLOCK_OUT}
+        try:
+            async with async_session_scope() as db:
+                clocked_in, clocked_out = await timetrackerservice.apply_clock_events_async(
+                    db, clock_ins, clock_outs
+                )
+        except Exception as e:
+            logger.exception("Failed to write batch of %d clock events", len(events))
+            for _, _, future in events:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.events += len(events)
+        logger.debug("Wrote %d clock-ins and %d clock-outs in one transaction", len(clock_ins), len(clock_outs))
+        for kind, user_id, future in events:
+            if future.done():
+                # The request went away while waiting
+                continue
+            if kind == CLOCK_IN:
+                future.set_result(clocked_in[user_id])
+            elif user_id in clocked_out:
+                future.set_result(clocked_out[user_id])
+            else:
+                future.set_exception(HTTPException(status_code=404, detail="No active work session found to end."))
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "events": self.events,
+            "avg_batch_size": round(self.events / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+            "window_seconds": self.window_seconds,
+            "max_batch": self.max_batch,
+        }
+
+
+def _split_conflicts(events: List[Tuple[str, UUID, asyncio.Future]]) -> List[list]:
+    """Split a batch where a user switches between clock-in and clock-out, keeping arrival order.
+
+    Repeats of the same event by one user stay together and share the result.
+    """
+    groups, current, kinds = [], [], {}
+    for event in events:
+        kind, user_id, _ = event
+        if kinds.get(user_id, kind) != kind:
+            groups.append(current)
+            current, kinds = [], {}
+        kinds[user_id] = kind
+        current.append(event)
+    if current:
+        groups.append(current)
+    return groups
+
+
+# Global batcher instance (per worker process)
+clock_batcher = ClockEventBatcher(
+    window_seconds=settings.CLOCK_BATCH_WINDOW_SECONDS,
+    max_batch=settings.CLOCK_BATCH_MAX_SIZE,
+)
@@ -1,14 +1,22 @@
+import asyncio
+import threading
+import time
+from collections import Counter
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, func, or_, select, tuple_, update
 from uuid import UUID
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from fastapi import HTTPException
 
+from app.core.config import settings
 from app.models.room import CoworkingRoom, RoomStatus
   # from app.models.room_participant import RoomParticipant
 from app.models.coworking import RoomParticipant, RoomMessage, RoomMessageType
 from app.models.user import User
+from app.services.room_message_buffer import BufferedMessage, room_message_buffer
+from app.services.room_presence import room_presence
 from app.schemas.room import (
     CoworkingRoomCreate,
     CoworkingRoomUpdate,
@@ -19,86 +27,140 @@ from app.schemas.room import (
 )
 
 
-def get_all_rooms(db: Session) -> List[CoworkingRoomSummary]:
-    """Get all active coworking rooms with participant counts"""
-    rooms = db.query(CoworkingRoom).filter(
-        CoworkingRoom.status == RoomStatus.active
-    ).all()
-
-    room_summaries = []
-    for room in rooms:
-        # Count active participants (those who haven't left)
-        participant_count = db.query(func.count(RoomParticipant.id)).filter(
-            and_(
-                RoomParticipant.room_id == room.id,
-                RoomParticipant.left_at.is_(None)
-            )
-        ).scalar()
-
-        room_summaries.append(CoworkingRoomSummary(
-            id=room.id,
-            name=room.name,
-            description=room.description,
-            status=room.status.value,
-            participant_count=participant_count or 0,
-            max_participants=room.max_participants,
-            color=room.color
-        ))
+# Room list snapshot shared by all requests in this worker (see get_all_rooms)
+_room_list: List[CoworkingRoomSummary] = []
+_room_list_expires_at = 0.0
+_room_list_lock = threading.Lock()
+_room_list_async_lock = asyncio.Lock()
 
-    return room_summaries
 
+def _active_rooms_query():
+    return select(CoworkingRoom).where(CoworkingRoom.status == RoomStatus.active)
 
-def get_room_details(db: Session, room_id: UUID) -> Optional[CoworkingRoomDetail]:
-    """Get detailed information about a specific room"""
-    room = db.query(CoworkingRoom).filter(CoworkingRoom.id == room_id).first()
-    if not room:
-        return None
 
-    # Get active participants
-    participants_data = db.query(RoomParticipant, User).join(
+def _room_participants_query(room_id: UUID):
+    return select(RoomParticipant, User).join(
         User, RoomParticipant.user_id == User.id
-    ).filter(
+    ).where(
         and_(
             RoomParticipant.room_id == room_id,
             RoomParticipant.left_at.is_(None)
         )
-    ).all()
+    )
+
+
+# Message history page sizes for GET /coworking/rooms/{room_id}/messages
+ROOM_MESSAGES_DEFAULT_LIMIT = 50
+ROOM_MESSAGES_MAX_LIMIT = 200
+
+
+def _messages_before_query(room_id: UUID, before: Optional[UUID], limit: int):
+    """Newest-first keyset page on idx_room_message_room_created, older than message `before`"""
+    query = select(RoomMessage, User).outerjoin(
+        User, RoomMessage.user_id == User.id
+    ).where(
+        RoomMessage.room_id == room_id
+    )
+    if before is not None:
+        # Compare against the stored timestamp of the cursor message (id breaks ties)
+        before_created_at = select(RoomMessage.created_at).where(
+            RoomMessage.id == before,
+            RoomMessage.room_id == room_id
+        ).scalar_subquery()
+        query = query.where(or_(
+            RoomMessage.created_at < before_created_at,
+            and_(RoomMessage.created_at == before_created_at, RoomMessage.id < before)
+        ))
+    return query.order_by(RoomMessage.created_at.desc(), RoomMessage.id.desc()).limit(limit)
+
+
+def _buffered_message(message: RoomMessage, user: Optional[User]) -> BufferedMessage:
+    return BufferedMessage(
+        id=message.id,
+        user=user.full_name or user.username if user else "System",
+        avatar=getattr(user, 'avatar_url', None) if user else None,
+        text=message.message_text,
+        created_at=message.created_at
+    )
+
+
+def _buffered_response(message: BufferedMessage) -> RoomMessageResponse:
+    return RoomMessageResponse(
+        id=message.id,
+        user=message.user,
+        avatar=message.avatar,
+        text=message.text,
+        time=message.created_at.strftime("%H:%M"),
+        created_at=message.created_at
+    )
+
 
+def _message_response(message: RoomMessage, user: Optional[User]) -> RoomMessageResponse:
+    return _buffered_response(_buffered_message(message, user))
+
+
+def _message_page(rows, limit: int) -> tuple[List[RoomMessageResponse], Optional[str]]:
+    # rows is newest first with one look-ahead row; the page is returned oldest first
+    page = rows[:limit]
+    next_cursor = str(page[-1][0].id) if len(rows) > limit else None
+    return [_message_response(message, user) for message, user in reversed(page)], next_cursor
+
+
+def _buffered_page(room_id: UUID, limit: int) -> Optional[tuple[List[RoomMessageResponse], Optional[str]]]:
+    """Latest page served from the ring buffer, or None when the room is not cached"""
+    cached = room_message_buffer.recent(room_id, limit)
+    if cached is None:
+        return None
+    messages, has_more = cached
+    next_cursor = str(messages[0].id) if has_more and messages else None
+    return [_buffered_response(message) for message in messages], next_cursor
+
+
+def _prime_buffer(room_id: UUID, rows, fetch_limit: int, since: int) -> None:
+    # rows is newest first with one look-ahead row beyond fetch_limit
+    room_message_buffer.prime(
+        room_id,
+        [_buffered_message(message, user) for message, user in rows[:fetch_limit]],
+        complete=len(rows) <= fetch_limit,
+        since=since
+    )
+
+
+def _room_summary(room: CoworkingRoom, participant_count: Optional[int]) -> CoworkingRoomSummary:
+    return CoworkingRoomSummary(
+        id=room.id,
+        name=room.name,
+        description=room.description,
+        status=room.status.value,
+        participant_count=participant_count or 0,
+        max_participants=room.max_participants,
+        color=room.color
+    )
+
+
+def _is_speaking(room_id: UUID, user_id: UUID, participant: RoomParticipant) -> bool:
+    # Live speaking state is only kept in memory (see update_speaking_status)
+    speaking = room_presence.is_speaking(room_id, user_id)
+    return participant.is_speaking if speaking is None else speaking
+
+
+def _room_detail(room: CoworkingRoom, participants_data) -> CoworkingRoomDetail:
     participants = []
     for participant, user in participants_data:
         participants.append(RoomParticipantResponse(
             id=user.id,
             name=user.full_name or user.username,
             avatar=getattr(user, 'avatar_url', None),
-            is_speaking=participant.is_speaking,
+            is_speaking=_is_speaking(room.id, user.id, participant),
             is_muted=participant.is_muted,
             joined_at=participant.joined_at
         ))
 
-    # Get recent messages (last 50)
-    messages_data = db.query(RoomMessage, User).outerjoin(
-        User, RoomMessage.user_id == User.id
-    ).filter(
-        RoomMessage.room_id == room_id
-    ).order_by(RoomMessage.created_at.desc()).limit(50).all()
-
-    messages = []
-    for message, user in reversed(messages_data):
-        messages.append(RoomMessageResponse(
-            id=message.id,
-            user=user.full_name or user.username if user else "System",
-            avatar=getattr(user, 'avatar_url', None) if user else None,
-            text=message.message_text,
-            time=message.created_at.strftime("%H:%M"),
-            created_at=message.created_at
-        ))
-
     return CoworkingRoomDetail(
         id=room.id,
         name=room.name,
         description=room.description,
         participants=participants,
-        messages=messages,
         tasks_completed=0,
         tasks_total=0,
         focus_time=0,
@@ -106,6 +168,147 @@ def get_room_details(db: Session, room_id: UUID) -> Optional[CoworkingRoomDetail
     )
 
 
+def invalidate_room_list() -> None:
+    """Drop the cached room list after a join, leave or room change on this worker"""
+    global _room_list_expires_at
+    _room_list_expires_at = 0.0
+
+
+def _store_room_list(rooms) -> List[CoworkingRoomSummary]:
+    global _room_list, _room_list_expires_at
+    _room_list = [_room_summary(room, room.current_participants) for room in rooms]
+    _room_list_expires_at = time.monotonic() + settings.ROOM_LIST_CACHE_TTL_SECONDS
+    return _room_list
+
+
+def get_all_rooms(db: Session) -> List[CoworkingRoomSummary]:
+    """Get all active coworking rooms with participant counts.
+
+    Served from a per-worker snapshot for ROOM_LIST_CACHE_TTL_SECONDS, so polling
+    clients cost one query per TTL window rather than one per request.
+    """
+    if time.monotonic() < _room_list_expires_at:
+        return list(_room_list)
+    with _room_list_lock:
+        # Another thread may have rebuilt the snapshot while we waited
+        if time.monotonic() < _room_list_expires_at:
+            return list(_room_list)
+        return list(_store_room_list(db.execute(_active_rooms_query()).scalars().all()))
+
+
+async def get_all_rooms_async(db: AsyncSession) -> List[CoworkingRoomSummary]:
+    """Async variant of get_all_rooms for the async read routes"""
+    if time.monotonic() < _room_list_expires_at:
+        return list(_room_list)
+    async with _room_list_async_lock:
+        if time.monotonic() < _room_list_expires_at:
+            return list(_room_list)
+        return list(_store_room_list((await db.execute(_active_rooms_query())).scalars().all()))
+
+
+def get_room_details(db: Session, room_id: UUID) -> Optional[CoworkingRoomDetail]:
+    """Get detailed information about a specific room (message history is paged separately)"""
+    room = db.get(CoworkingRoom, room_id)
+    if not room:
+        return None
+
+    participants_data = db.execute(_room_participants_query(room_id)).all()
+    return _room_detail(room, participants_data)
+
+
+async def get_room_details_async(db: AsyncSession, room_id: UUID) -> Optional[CoworkingRoomDetail]:
+    """Async variant of get_room_details for the async read routes"""
+    room = await db.get(CoworkingRoom, room_id)
+    if not room:
+        return None
+
+    participants_data = (await db.execute(_room_participants_query(room_id))).all()
+    return _room_detail(room, participants_data)
+
+
+def get_room_messages(
+    db: Session,
+    room_id: UUID,
+    before: Optional[UUID] = None,
+    limit: int = ROOM_MESSAGES_DEFAULT_LIMIT
+) -> tuple[List[RoomMessageResponse], Optional[str]]:
+    """One page of room history, oldest first, and the cursor for the older page (None at the start).
+
+    The cursor is the id of the oldest message on the page. The latest page comes from
+    the in-memory ring buffer; the database is read on a cold buffer and for older pages.
+    """
+    limit = max(1, min(limit, ROOM_MESSAGES_MAX_LIMIT))
+    if before is None:
+        page = _buffered_page(room_id, limit)
+        if page is not None:
+            return page
+    # A cold latest-page read also fills the buffer
+    fetch_limit = max(limit, room_message_buffer.maxlen) if before is None else limit
+    since = room_message_buffer.appends(room_id)
+    rows = db.execute(_messages_before_query(room_id, before, fetch_limit + 1)).all()
+    if not rows and not db.get(CoworkingRoom, room_id):
+        raise HTTPException(status_code=404, detail="Room not found")
+    if before is None:
+        _prime_buffer(room_id, rows, fetch_limit, since)
+    return _message_page(rows, limit)
+
+
+async def get_room_messages_async(
+    db: AsyncSession,
+    room_id: UUID,
+    before: Optional[UUID] = None,
+    limit: int = ROOM_MESSAGES_DEFAULT_LIMIT
+) -> tuple[List[RoomMessageResponse], Optional[str]]:
+    """Async variant of get_room_messages for the async read routes"""
+    limit = max(1, min(limit, ROOM_MESSAGES_MAX_LIMIT))
+    if before is None:
+        page = _buffered_page(room_id, limit)
+        if page is not None:
+            return page
+    fetch_limit = max(limit, room_message_buffer.maxlen) if before is None else limit
+    since = room_message_buffer.appends(room_id)
+    rows = (await db.execute(_messages_before_query(room_id, before, fetch_limit + 1))).all()
+    if not rows and not await db.get(CoworkingRoom, room_id):
+        raise HTTPException(status_code=404, detail="Room not found")
+    if before is None:
+        _prime_buffer(room_id, rows, fetch_limit, since)
+    return _message_page(rows, limit)
+
+
+def claim_seat(db: Session, room_id: UUID) -> Optional[int]:
+    """Atomically take a seat in an active room; returns the new count, or None if the room is full.
+
+    The capacity check and the increment are one conditional UPDATE, so concurrent
+    joins can never push current_participants past max_participants.
+    """
+    return db.execute(
+        update(CoworkingRoom)
+        .where(
+            CoworkingRoom.id == room_id,
+            CoworkingRoom.status == RoomStatus.active,
+            CoworkingRoom.current_participants < CoworkingRoom.max_participants
+        )
+        .values(current_participants=CoworkingRoom.current_participants + 1)
+        .returning(CoworkingRoom.current_participants)
+    ).scalar_one_or_none()
+
+
+def _release_seat_stmt(room_id: UUID, count: int):
+    return (
+        update(CoworkingRoom)
+        .where(CoworkingRoom.id == room_id)
+        .values(current_participants=case(
+            (CoworkingRoom.current_participants > count, CoworkingRoom.current_participants - count),
+            else_=0
+        ))
+    )
+
+
+def release_seat(db: Session, room_id: UUID, count: int = 1) -> None:
+    """Give back seats when participants leave or are removed; never drops below zero"""
+    db.execute(_release_seat_stmt(room_id, count))
+
+
 def join_room(db: Session, room_id: UUID, user_id: UUID) -> CoworkingRoomDetail:
     """Add a user to a coworking room"""
     # Check if room exists and is active
@@ -116,17 +319,6 @@ def join_room(db: Session, room_id: UUID, user_id: UUID) -> CoworkingRoomDetail:
     if room.status != RoomStatus.active:
         raise HTTPException(status_code=400, detail="Room is not active")
 
-    # Check room capacity
-    current_participants = db.query(func.count(RoomParticipant.id)).filter(
-        and_(
-            RoomParticipant.room_id == room_id,
-            RoomParticipant.left_at.is_(None)
-        )
-    ).scalar()
-
-    if current_participants >= room.max_participants:
-        raise HTTPException(status_code=400, detail="Room is full")
-
     # Check if user has any existing participation record (active or not)
     existing_participant = db.query(RoomParticipant).filter(
         and_(
@@ -135,17 +327,23 @@ def join_room(db: Session, room_id: UUID, user_id: UUID) -> CoworkingRoomDetail:
         )
     ).first()
 
+    if existing_participant and existing_participant.left_at is None:
+        raise HTTPException(status_code=400, detail="Already in this room")
+
+    # Check room capacity and take a seat in one statement
+    if claim_seat(db, room_id) is None:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Room is full")
+
     if existing_participant:
-        # If user already has a record, check if they're currently active
-        if existing_participant.left_at is None:
-            raise HTTPException(status_code=400, detail="Already in this room")
-        
         # If they previously left, reactivate their participation
         print(f"Reactivating participant {user_id} in room {room_id}")
         existing_participant.left_at = None
         existing_participant.is_muted = True
         existing_participant.is_speaking = False
         existing_participant.joined_at = func.now()
+        # Not reapable until a socket heartbeats for the new participation
+        existing_participant.last_seen_at = None
         participant = existing_participant
     else:
         # Create new participant record
@@ -167,8 +365,13 @@ def join_room(db: Session, room_id: UUID, user_id: UUID) -> CoworkingRoomDetail:
         message_type=RoomMessageType.system
     )
     db.add(system_message)
+    db.flush()
+    buffered = _buffered_message(system_message, user)
 
     db.commit()
+    room_message_buffer.append(room_id, buffered)
+    room_presence.set_muted(room_id, user_id, True)
+    invalidate_room_list()
     db.refresh(participant)
 
     return get_room_details(db, room_id)
@@ -176,20 +379,22 @@ def join_room(db: Session, room_id: UUID, user_id: UUID) -> CoworkingRoomDetail:
 
 def leave_room(db: Session, room_id: UUID, user_id: UUID) -> bool:
     """Remove a user from a coworking room"""
-    participant = db.query(RoomParticipant).filter(
-        and_(
+    # Mark as left; the left_at IS NULL guard makes concurrent leaves release one seat only
+    left = db.execute(
+        update(RoomParticipant)
+        .where(
             RoomParticipant.room_id == room_id,
             RoomParticipant.user_id == user_id,
             RoomParticipant.left_at.is_(None)
         )
-    ).first()
+        .values(left_at=datetime.utcnow(), is_speaking=False)
+        .returning(RoomParticipant.id)
+    ).scalar_one_or_none()
 
-    if not participant:
+    if not left:
         raise HTTPException(status_code=404, detail="Not in this room")
 
-    # Mark as left
-    participant.left_at = datetime.utcnow()
-    participant.is_speaking = False
+    release_seat(db, room_id)
 
     # Add system message
     user = db.query(User).filter(User.id == user_id).first()
@@ -200,11 +405,66 @@ def leave_room(db: Session, room_id: UUID, user_id: UUID) -> bool:
         message_type=RoomMessageType.system
     )
     db.add(system_message)
+    db.flush()
+    buffered = _buffered_message(system_message, user)
 
     db.commit()
+    room_message_buffer.append(room_id, buffered)
+    room_presence.remove(room_id, user_id)
+    invalidate_room_list()
     return True
 
 
+async def touch_participants_async(db: AsyncSession, participants: Iterable[tuple[UUID, UUID]]) -> int:
+    """Record a heartbeat for (room_id, user_id) participations with a live socket, in one UPDATE"""
+    participants = list(participants)
+    if not participants:
+        return 0
+    result = await db.execute(
+        update(RoomParticipant)
+        .where(
+            RoomParticipant.left_at.is_(None),
+            tuple_(RoomParticipant.room_id, RoomParticipant.user_id).in_(participants)
+        )
+        .values(last_seen_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def reap_stale_participants_async(db: AsyncSession, stale_before: datetime) -> List[tuple[UUID, UUID]]:
+    """Close every participation whose last heartbeat is older than `stale_before`.
+
+    One UPDATE ... RETURNING marks them all as left; the left_at IS NULL guard means
+    that concurrent reapers on other workers (or a /leave racing with them) close and
+    release each participation only once. Participations that never connected a
+    socket (last_seen_at NULL) are left to /leave.
+    """
+    reaped = (await db.execute(
+        update(RoomParticipant)
+        .where(
+            RoomParticipant.left_at.is_(None),
+            RoomParticipant.last_seen_at.is_not(None),
+            RoomParticipant.last_seen_at < stale_before
+        )
+        .values(left_at=datetime.utcnow(), is_speaking=False)
+        .returning(RoomParticipant.room_id, RoomParticipant.user_id)
+        .execution_options(synchronize_session=False)
+    )).all()
+    if not reaped:
+        return []
+
+    for room_id, count in Counter(room_id for room_id, _ in reaped).items():
+        await db.execute(_release_seat_stmt(room_id, count))
+    await db.commit()
+
+    for room_id, user_id in reaped:
+        room_presence.remove(room_id, user_id)
+    invalidate_room_list()
+    return [(room_id, user_id) for room_id, user_id in reaped]
+
+
 def send_message(
     db: Session,
     room_id: UUID,
@@ -233,20 +493,15 @@ def send_message(
         message_type=RoomMessageType[message_type]
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    db.flush()
 
     # Get user for response
     user = db.query(User).filter(User.id == user_id).first()
+    buffered = _buffered_message(message, user)
 
-    return RoomMessageResponse(
-        id=message.id,
-        user=user.full_name or user.username,
-        avatar=getattr(user, 'avatar_url', None),
-        text=message.message_text,
-        time=message.created_at.strftime("%H:%M"),
-        created_at=message.created_at
-    )
+    db.commit()
+    room_message_buffer.append(room_id, buffered)
+    return _buffered_response(buffered)
 
 
 def toggle_microphone(db: Session, room_id: UUID, user_id: UUID, is_muted: bool) -> bool:
@@ -268,28 +523,35 @@ def toggle_microphone(db: Session, room_id: UUID, user_id: UUID, is_muted: bool)
         participant.is_speaking = False
 
     db.commit()
+    room_presence.set_muted(room_id, user_id, is_muted)
     return True
 
 
-def update_speaking_status(db: Session, room_id: UUID, user_id: UUID, is_speaking: bool) -> bool:
-    """Update user's speaking status"""
-    participant = db.query(RoomParticipant).filter(
-        and_(
-            RoomParticipant.room_id == room_id,
-            RoomParticipant.user_id == user_id,
-            RoomParticipant.left_at.is_(None)
-        )
-    ).first()
+async def update_speaking_status(db: AsyncSession, room_id: UUID, user_id: UUID, is_speaking: bool) -> bool:
+    """Update user's speaking status.
 
-    if not participant:
-        raise HTTPException(status_code=404, detail="Not in this room")
+    Held in the in-memory presence map and fanned out debounced over the room
+    WebSocket; nothing is written to the database. The participant row is only
+    read when this worker is not yet tracking the user.
+    """
+    presence = room_presence.get(room_id, user_id)
+    if presence is None:
+        participant = (await db.execute(
+            select(RoomParticipant).where(
+                RoomParticipant.room_id == room_id,
+                RoomParticipant.user_id == user_id,
+                RoomParticipant.left_at.is_(None)
+            )
+        )).scalar_one_or_none()
+        if not participant:
+            raise HTTPException(status_code=404, detail="Not in this room")
+        presence = room_presence.track(room_id, user_id, muted=participant.is_muted)
 
     # Can only speak if not muted
-    if is_speaking and participant.is_muted:
+    if is_speaking and presence.muted:
         raise HTTPException(status_code=400, detail="Cannot speak while muted")
 
-    participant.is_speaking = is_speaking
-    db.commit()
+    room_presence.set_speaking(room_id, user_id, is_speaking)
     return True
 
 
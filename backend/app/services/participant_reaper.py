@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import async_session_scope
+from app.services import coworkingservice
+from app.services.websocket_manager import websocket_manager
+
+logger = logging.getLogger(__name__)
+
+
+class ParticipantReaper:
+    """Closes room participations whose client has gone away without calling /leave.
+
+    Every cycle this worker closes its sockets that stopped heartbeating, stamps
+    last_seen_at for the participants still connected here (one UPDATE), then closes
+    every participation whose last heartbeat is older than the stale window (one
+    UPDATE, safe to run on every worker at once) and announces user-left for them.
+    """
+
+    def __init__(self, interval_seconds: float, stale_seconds: float, heartbeat_timeout_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.stale_seconds = stale_seconds
+        self.heartbeat_timeout_seconds = heartbeat_timeout_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.reaped = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Participant reaper cycle failed")
+
+    async def run_once(self) -> int:
+        await websocket_manager.close_silent_connections(self.heartbeat_timeout_seconds)
+        live = [(UUID(room_id), UUID(user_id)) for room_id, user_id in websocket_manager.live_participants()]
+
+        async with async_session_scope() as db:
+            await coworkingservice.touch_participants_async(db, live)
+            stale_before = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+            reaped = await coworkingservice.reap_stale_participants_async(db, stale_before)
+
+        for room_id, user_id in reaped:
+            await websocket_manager.publish_room_event(
+                str(room_id), "user-left", {"userId": str(user_id)}, str(user_id)
+            )
+        if reaped:
+            self.reaped += len(reaped)
+            logger.info(f"Reaped {len(reaped)} stale room participants")
+        return len(reaped)
+
+
+# Global reaper (one per worker process; cycles on different workers do not conflict)
+participant_reaper = ParticipantReaper(
+    interval_seconds=settings.ROOM_REAPER_INTERVAL_SECONDS,
+    stale_seconds=settings.ROOM_PARTICIPANT_STALE_SECONDS,
+    heartbeat_timeout_seconds=settings.WS_HEARTBEAT_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from uuid import UUID
+
+from app.core.config import settings
+
+
+class BufferedMessage(NamedTuple):
+    """Compact copy of a RoomMessageResponse kept in memory"""
+    id: UUID
+    user: str
+    avatar: Optional[str]
+    text: str
+    created_at: datetime
+
+
+def _order_key(message: BufferedMessage) -> tuple:
+    # Same order as the history query: created_at, then id
+    return message.created_at, str(message.id)
+
+
+class _RoomBuffer:
+    __slots__ = ("messages", "primed_at", "complete", "appends", "appended")
+
+    def __init__(self, maxlen: int):
+        # Oldest first
+        self.messages: deque = deque(maxlen=maxlen)
+        # Monotonic time of the last database load; until then appends alone are not the full tail
+        self.primed_at: Optional[float] = None
+        # The buffer holds the room's entire history (nothing evicted, nothing older in the DB)
+        self.complete = False
+        # Local appends so far, and the append number of each buffered message appended here
+        self.appends = 0
+        self.appended: Dict[UUID, int] = {}
+
+
+class RoomMessageBuffer:
+    """Per-room ring buffer of the most recent chat messages, shared by REST and WebSocket backfill.
+
+    Messages are appended after their transaction commits. A room is primed from the
+    database on its first read; afterwards recent history is served from memory and
+    the database is only used for older pages. Only this worker's writes are appended,
+    so a primed room expires after `ttl` seconds and the next read reloads the tail:
+    messages written (or deleted) through other workers show up within the TTL.
+    """
+
+    def __init__(self, maxlen: int, ttl: float):
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self._rooms: Dict[UUID, _RoomBuffer] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def append(self, room_id: UUID, message: BufferedMessage) -> None:
+        with self._lock:
+            room = self._rooms.get(room_id)
+            if room is None:
+                room = self._rooms[room_id] = _RoomBuffer(self.maxlen)
+            if len(room.messages) == self.maxlen:
+                room.complete = False
+                room.appended.pop(room.messages[0].id, None)
+            room.messages.append(message)
+            room.appends += 1
+            room.appended[message.id] = room.appends
+            if len(room.messages) > 1 and _order_key(message) < _order_key(room.messages[-2]):
+                # A transaction that started earlier committed later; keep the history keyset order
+                ordered = sorted(room.messages, key=_order_key)
+                room.messages.clear()
+                room.messages.extend(ordered)
+
+    def appends(self, room_id: UUID) -> int:
+        """Local append count of a room; read it before querying the tail that is passed to prime()"""
+        with self._lock:
+            room = self._rooms.get(room_id)
+            return room.appends if room is not None else 0
+
+    def prime(self, room_id: UUID, newest_first: Iterable[BufferedMessage], complete: bool, since: int) -> None:
+        """Replace the room's buffer with the tail of its history read from the database.
+
+        Messages appended here after the read started (append number above `since`)
+        are merged in, so a message committed between the database read and this call
+        is not lost; anything else the database no longer returns is dropped.
+        """
+        with self._lock:
+            room = self._rooms.get(room_id)
+            if room is None:
+                room = self._rooms[room_id] = _RoomBuffer(self.maxlen)
+            merged = {message.id: message for message in newest_first}
+            for message in room.messages:
+                if room.appended.get(message.id, 0) > since:
+                    merged.setdefault(message.id, message)
+            ordered = sorted(merged.values(), key=_order_key)
+            room.messages.clear()
+            room.messages.extend(ordered)
+            room.appended = {
+                message.id: room.appended[message.id]
+                for message in room.messages if room.appended.get(message.id, 0) > since
+            }
+            room.complete = complete and len(ordered) <= self.maxlen
+            room.primed_at = time.monotonic()
+
+    def recent(self, room_id: UUID, limit: int) -> Optional[tuple[List[BufferedMessage], bool]]:
+        """The newest `limit` messages (oldest first) and whether older ones exist; None if not cached"""
+        with self._lock:
+            room = self._rooms.get(room_id)
+            if (
+                room is None
+                or room.primed_at is None
+                or time.monotonic() - room.primed_at > self.ttl
+                or (limit > len(room.messages) and not room.complete)
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+            messages = list(room.messages)
+            has_more = len(messages) > limit or not room.complete
+            return messages[-limit:], has_more
+
+    def drop(self, room_id: UUID) -> None:
+        """Forget a room, e.g. after it is deleted"""
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rooms.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "rooms": len(self._rooms),
+                "maxlen": self.maxlen,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Global buffer instance (per worker process)
+room_message_buffer = RoomMessageBuffer(
+    maxlen=settings.ROOM_MESSAGE_BUFFER_SIZE, ttl=settings.ROOM_MESSAGE_BUFFER_TTL_SECONDS
+)
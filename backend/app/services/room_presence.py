@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.websocket_manager import websocket_manager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Presence:
+    """Live voice state of one participant"""
+    muted: bool = True
+    speaking: bool = False
+
+
+class RoomPresence:
+    """In-memory speaking/mute state per room with debounced speaking-changed fan-out.
+
+    Voice activity detection can flip speaking several times per second. Flips are
+    only recorded here; each room publishes the settled state of its participants at
+    most once per SPEAKING_DEBOUNCE_SECONDS, and a flip that ends where it started
+    publishes nothing. Speaking is never written to the database.
+    """
+
+    def __init__(self, debounce_seconds: float):
+        self.debounce_seconds = debounce_seconds
+        self._rooms: Dict[UUID, Dict[UUID, Presence]] = {}
+        # room -> user -> speaking state last sent to the room
+        self._published: Dict[UUID, Dict[UUID, bool]] = {}
+        # Rooms with a flush scheduled
+        self._dirty: Set[UUID] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        # Also mutated from sync routes running in the threadpool (join, leave, mic toggle)
+        self._lock = threading.Lock()
+
+    def get(self, room_id: UUID, user_id: UUID) -> Optional[Presence]:
+        with self._lock:
+            return self._rooms.get(room_id, {}).get(user_id)
+
+    def track(self, room_id: UUID, user_id: UUID, muted: bool = True) -> Presence:
+        """Start tracking a participant (on join, or lazily from the database row)"""
+        with self._lock:
+            presence = self._rooms.setdefault(room_id, {}).get(user_id)
+            if presence is None:
+                presence = self._rooms[room_id][user_id] = Presence(muted=muted)
+                self._published.setdefault(room_id, {})[user_id] = False
+            return presence
+
+    def set_muted(self, room_id: UUID, user_id: UUID, muted: bool) -> None:
+        """Record a mic toggle; muting also ends speaking (the mic-toggled event carries that)"""
+        with self._lock:
+            presence = self._rooms.setdefault(room_id, {}).setdefault(user_id, Presence())
+            presence.muted = muted
+            if muted:
+                presence.speaking = False
+                self._published.setdefault(room_id, {})[user_id] = False
+
+    def remove(self, room_id: UUID, user_id: UUID) -> None:
+        with self._lock:
+            self._rooms.get(room_id, {}).pop(user_id, None)
+            self._published.get(room_id, {}).pop(user_id, None)
+            if not self._rooms.get(room_id):
+                self._rooms.pop(room_id, None)
+                self._published.pop(room_id, None)
+
+    def apply_remote_event(self, room_id: str, event_type: str, data: dict) -> None:
+        """Follow a leave, reap or mic toggle handled by another worker.
+
+        A user-left (also sent when a user's last socket closes) only forgets the
+        entry, so the next speaking update re-reads the participant row.
+        """
+        room_id, user_id = UUID(room_id), UUID(data["userId"])
+        if event_type == "user-left":
+            self.remove(room_id, user_id)
+        elif event_type == "mic-toggled" and self.get(room_id, user_id) is not None:
+            self.set_muted(room_id, user_id, data["isMuted"])
+
+    def is_speaking(self, room_id: UUID, user_id: UUID) -> Optional[bool]:
+        presence = self.get(room_id, user_id)
+        return presence.speaking if presence else None
+
+    def set_speaking(self, room_id: UUID, user_id: UUID, speaking: bool) -> None:
+        """Record a voice-activity flip and schedule the room's debounced publish.
+
+        Must be called from the event loop.
+        """
+        with self._lock:
+            self._rooms.setdefault(room_id, {}).setdefault(user_id, Presence()).speaking = speaking
+            if room_id in self._dirty:
+                return
+            self._dirty.add(room_id)
+        task = asyncio.get_running_loop().create_task(self._flush_later(room_id))
+        # Keep a reference so the task is not garbage collected before it runs
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self, room_id: UUID) -> None:
+        await asyncio.sleep(self.debounce_seconds)
+        with self._lock:
+            self._dirty.discard(room_id)
+            published = self._published.setdefault(room_id, {})
+            changes = {
+                user_id: presence.speaking
+                for user_id, presence in self._rooms.get(room_id, {}).items()
+                if published.get(user_id, False) != presence.speaking
+            }
+            published.update(changes)
+
+        for user_id, speaking in changes.items():
+            try:
+                await websocket_manager.publish_room_event(
+                    str(room_id), "speaking-changed",
+                    {"userId": str(user_id), "isSpeaking": speaking}, str(user_id)
+                )
+            except Exception:
+                logger.exception("Failed to publish speaking state for room %s", room_id)
+
+
+# Global presence map (per worker process)
+room_presence = RoomPresence(debounce_seconds=settings.SPEAKING_DEBOUNCE_SECONDS)
+websocket_manager.add_room_event_listener({"user-left", "mic-toggled"}, room_presence.apply_remote_event)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID, uuid4
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.services.ws_backplane import Backplane, create_backplane
+
+logger = logging.getLogger(__name__)
+
+# Cached views of a user's open sessions
+CURRENT = "current"  # latest open session of any type (timer widget)
+WORK = "work"        # latest open work session (dashboard clock widget)
+KINDS = (CURRENT, WORK)
+
+_MISSING = object()
+
+
+class CurrentSessionCache:
+    """Per-user cache of the open-session responses polled by the timer widgets.
+
+    Entries hold the built response, or None for "no open session", so idle users
+    polling the widgets are served without a query too. Every timetrackerservice
+    transition drops the user's entries once its transaction is committed and
+    publishes the drop on the backplane so the other workers forget them as well;
+    the next read reloads from the database. A read that started before a drop does
+    not store its (possibly stale) result. The TTL bounds staleness should an
+    invalidation be lost.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, backplane: Backplane = None):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # (user_id, kind) -> token of the read currently loading it
+        self._loading: dict = {}
+        self._lock = threading.Lock()
+        self.backplane = backplane or create_backplane(settings.SESSION_CACHE_CHANNEL)
+        self.node_id = uuid4().hex
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.remote_invalidations = 0
+
+    async def start(self) -> None:
+        """Subscribe to invalidations from other workers (application startup)"""
+        self._loop = asyncio.get_running_loop()
+        await self.backplane.start(self.node_id, self._on_backplane_message)
+
+    async def stop(self) -> None:
+        if self._loop is not None:
+            await self.backplane.stop(self.node_id)
+            self._loop = None
+
+    async def get_or_load(self, user_id: UUID, kind: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        key = (user_id, kind)
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            token = object()
+            self._loading[key] = token
+
+        try:
+            value = await load()
+        except BaseException:
+            with self._lock:
+                if self._loading.get(key) is token:
+                    del self._loading[key]
+            raise
+
+        with self._lock:
+            # An invalidation while loading removed the token: do not cache
+            if self._loading.get(key) is token:
+                del self._loading[key]
+                self._cache[key] = value
+        return value
+
+    def invalidate(self, *user_ids: UUID) -> None:
+        """Drop the users' entries here and on every other worker (call after commit).
+
+        Safe to call from the event loop and from threadpool routes alike.
+        """
+        if not user_ids:
+            return
+        self._drop(user_ids)
+        if self._loop is not None:
+            envelope = {"kind": "session-invalidate", "user_ids": [str(user_id) for user_id in user_ids]}
+            asyncio.run_coroutine_threadsafe(self.backplane.publish(self.node_id, envelope), self._loop)
+
+    def _drop(self, user_ids) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                if not isinstance(user_id, UUID):
+                    user_id = UUID(str(user_id))
+                for kind in KINDS:
+                    self._cache.pop((user_id, kind), None)
+                    self._loading.pop((user_id, kind), None)
+            self.invalidations += len(user_ids)
+
+    async def _on_backplane_message(self, envelope: dict) -> None:
+        if envelope.get("kind") != "session-invalidate":
+            logger.warning("Unknown session cache message kind: %s", envelope.get("kind"))
+            return
+        self.remote_invalidations += len(envelope["user_ids"])
+        self._drop(envelope["user_ids"])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._loading.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl_seconds": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "remote_invalidations": self.remote_invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "backplane": self.backplane.name,
+            }
+
+
+# Global cache instance (per worker process, kept coherent through the backplane)
+session_cache = CurrentSessionCache(
+    maxsize=settings.SESSION_CACHE_MAX_SIZE,
+    ttl=settings.SESSION_CACHE_TTL_SECONDS,
+)
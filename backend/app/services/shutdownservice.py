@@ -7,6 +7,7 @@ from uuid import UUID
 import logging
 import json
 from app.models.shutdown_reflection import ShutdownReflection
+from app.models.challenge import UserChallengeStats
 from app.models.task import Task
 from app.schemas.shutdown import (
     ShutdownReflectionCreate,
@@ -52,6 +53,71 @@ def _serialize_reflection(reflection: ShutdownReflection) -> ShutdownReflectionR
     )
 
 
+def _compute_shutdown_streak(session: Session, user_id: UUID, as_of: date | None = None) -> tuple[int, date | None]:
+    """Consecutive reflection days ending at the latest reflection day (on or before `as_of` if given).
+
+    One query for the distinct reflection days, newest first; only used to rebuild the
+    stored counter (back-dated reflections, users without a stats row yet).
+    """
+    query = select(func.date(ShutdownReflection.shutdown_date)).where(ShutdownReflection.user_id == user_id)
+    if as_of is not None:
+        query = query.where(
+            ShutdownReflection.shutdown_date < datetime.combine(as_of + timedelta(days=1), datetime.min.time())
+        )
+    days = session.execute(
+        query.distinct().order_by(func.date(ShutdownReflection.shutdown_date).desc())
+    ).scalars()
+
+    streak = 0
+    last_day = None
+    expected = None
+    for day in days:
+        # SQLite returns DATE() as text
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        if expected is not None and day != expected:
+            break
+        if last_day is None:
+            last_day = day
+        streak += 1
+        expected = day - timedelta(days=1)
+    return streak, last_day
+
+
+def _record_shutdown_day(session: Session, user_id: UUID, shutdown_day: date) -> None:
+    """Advance UserChallengeStats.current_shutdown_streak for a new reflection (same transaction)"""
+    stats = session.execute(
+        select(UserChallengeStats).where(UserChallengeStats.user_id == user_id).with_for_update()
+    ).scalar_one_or_none()
+    if stats is None:
+        stats = UserChallengeStats(user_id=user_id, current_shutdown_streak=0)
+        session.add(stats)
+
+    last_day = stats.last_shutdown_date
+    if last_day is None or shutdown_day < last_day:
+        # First tracked reflection or a back-dated one that may close a gap: rebuild
+        session.flush()
+        stats.current_shutdown_streak, stats.last_shutdown_date = _compute_shutdown_streak(session, user_id)
+    elif shutdown_day == last_day + timedelta(days=1):
+        stats.current_shutdown_streak = (stats.current_shutdown_streak or 0) + 1
+        stats.last_shutdown_date = shutdown_day
+    elif shutdown_day > last_day:
+        stats.current_shutdown_streak = 1
+        stats.last_shutdown_date = shutdown_day
+    # Same day as the last reflection: streak unchanged
+
+
+def get_shutdown_streak(session: Session, user_id: UUID, today: date) -> int:
+    """Current streak from the maintained counter: a primary-key lookup instead of a per-day walk"""
+    stats = session.get(UserChallengeStats, user_id)
+    if stats is None or stats.last_shutdown_date is None:
+        streak, last_day = _compute_shutdown_streak(session, user_id, today)
+    else:
+        streak, last_day = stats.current_shutdown_streak or 0, stats.last_shutdown_date
+    # The streak ends today; a missed day (or none yet today) breaks it
+    return streak if last_day == today else 0
+
+
 def create_shutdown_reflection(
     session: Session,
     reflection_data: ShutdownReflectionCreate,
@@ -66,6 +132,7 @@ def create_shutdown_reflection(
             shutdown_date=reflection_data.shutdown_date
         )
         session.add(db_reflection)
+        _record_shutdown_day(session, user_id, reflection_data.shutdown_date.date())
         session.commit()
         session.refresh(db_reflection)
         logger.info(f'Shutdown reflection created: {db_reflection.id}')
@@ -127,31 +194,7 @@ def get_shutdown_summary(session: Session, user_id: UUID):
             for task in today_tasks
         ]
         
-        shutdown_streak = 0
-        current_date = today
-        while True:
-            day_start = datetime.combine(current_date, datetime.min.time())
-            day_end = datetime.combine(current_date, datetime.max.time())
-            
-            result = session.execute(
-                select(ShutdownReflection).where(
-                    and_(
-                        ShutdownReflection.user_id == user_id,
-                        ShutdownReflection.shutdown_date >= day_start,
-                        ShutdownReflection.shutdown_date <= day_end
-                    )
-                )
-            )
-            has_reflection = result.scalar_one_or_none() is not None
-            
-            if not has_reflection:
-                break
-            
-            shutdown_streak += 1
-            current_date -= timedelta(days=1)
-            
-            if shutdown_streak > 365:
-                break
+        shutdown_streak = get_shutdown_streak(session, user_id, today)
         
         focus_time = tasks_completed * 25
         focus_goal = 480
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, update, func as sql_func
 from fastapi import HTTPException, status
 from uuid import UUID
@@ -114,50 +115,57 @@ def create_task(session: Session, task: TaskCreate, user_id: UUID) -> Task:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
 
+def _tasks_query(user_id: UUID, completed: Optional[bool] = None,
+                 priority: Optional[str] = None, tags: Optional[List[str]] = None,
+                 due_today: Optional[bool] = None, upcoming: Optional[bool] = None):
+    """Build the filtered, ordered task list query shared by get_tasks and get_tasks_async"""
+    query = select(Task).where(Task.user_id == user_id)
+
+    # Filter by completion status
+    if completed is not None:
+        query = query.where(Task.completed == completed)
+
+    # Filter by priority
+    if priority:
+        query = query.where(Task.priority == priority)
+
+    # Filter by tags (if task has any of the specified tags)
+    if tags:
+        query = query.where(sql_func.json_array_length(Task.tags) > 0)
+        # This is a simplified check - for exact tag matching, you'd need more complex SQL
+
+    # due_date is naive UTC, so the bounds are too (asyncpg rejects aware values for it)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    # Filter for tasks due today
+    if due_today:
+        start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_today = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+        query = query.where(Task.due_date >= start_of_today, Task.due_date <= end_of_today)
+
+    # Filter for upcoming tasks (due in the future, not completed, not due today)
+    if upcoming:
+        end_of_today = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+        query = query.where(Task.due_date > end_of_today, Task.completed == False)
+
+    # Order by priority (high first) and due date
+    from sqlalchemy import case
+    priority_order = case(
+        (Task.priority == 'high', 1),
+        (Task.priority == 'medium', 2),
+        (Task.priority == 'low', 3),
+        else_=4
+    )
+    query = query.order_by(priority_order, Task.due_date.asc().nullslast(), Task.created_at.desc())
+
+    return query
+
+
 def get_tasks(session: Session, user_id: UUID, completed: Optional[bool] = None, 
               priority: Optional[str] = None, tags: Optional[List[str]] = None,
               due_today: Optional[bool] = None, upcoming: Optional[bool] = None) -> list[Task]:
     try:
-        query = select(Task).where(Task.user_id == user_id)
-        
-        # Filter by completion status
-        if completed is not None:
-            query = query.where(Task.completed == completed)
-            
-        # Filter by priority
-        if priority:
-            query = query.where(Task.priority == priority)
-            
-        # Filter by tags (if task has any of the specified tags)
-        if tags:
-            query = query.where(sql_func.json_array_length(Task.tags) > 0)
-            # This is a simplified check - for exact tag matching, you'd need more complex SQL
-            
-        # Filter for tasks due today
-        if due_today:
-            from datetime import datetime, timezone
-            now = datetime.now(timezone.utc)
-            start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_today = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-            query = query.where(Task.due_date >= start_of_today, Task.due_date <= end_of_today)
-            
-        # Filter for upcoming tasks (due in the future, not completed, not due today)
-        if upcoming:
-            from datetime import datetime, timezone
-            now = datetime.now(timezone.utc)
-            end_of_today = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-            query = query.where(Task.due_date > end_of_today, Task.completed == False)
-            
-        # Order by priority (high first) and due date
-        from sqlalchemy import case
-        priority_order = case(
-            (Task.priority == 'high', 1),
-            (Task.priority == 'medium', 2),
-            (Task.priority == 'low', 3),
-            else_=4
-        )
-        query = query.order_by(priority_order, Task.due_date.asc().nullslast(), Task.created_at.desc())
-        
+        query = _tasks_query(user_id, completed, priority, tags, due_today, upcoming)
         result = session.execute(query)
         tasks = result.scalars().all()
         return tasks
@@ -167,6 +175,20 @@ def get_tasks(session: Session, user_id: UUID, completed: Optional[bool] = None,
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
 
+async def get_tasks_async(session: AsyncSession, user_id: UUID, completed: Optional[bool] = None,
+                          priority: Optional[str] = None, tags: Optional[List[str]] = None,
+                          due_today: Optional[bool] = None, upcoming: Optional[bool] = None) -> list[Task]:
+    """Async variant of get_tasks for the async read routes"""
+    try:
+        query = _tasks_query(user_id, completed, priority, tags, due_today, upcoming)
+        result = await session.execute(query)
+        return result.scalars().all()
+    except Exception as e:
+        logger.error(f"Error fetching tasks: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+
 def get_task(session: Session, task_id: UUID, user_id: UUID) -> Task:
     try:
         result = session.execute(select(Task).where(
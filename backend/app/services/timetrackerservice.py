@@ -1,11 +1,18 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, Integer, case, cast, exists, extract, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.timelog import Timelog
 from app.models.user import User
+from app.models.daily_focus_rollup import DailyFocusRollup
 from app.schemas.timelog import StartSessionRequest, EndSessionRequest, FocusSessionResponse, PauseSessionRequest, ResumeSessionRequest
+from app.services.session_cache import session_cache, CURRENT
 from datetime import datetime, timezone, timedelta
 from fastapi import HTTPException
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 def build_focus_session_response(session: Timelog) -> FocusSessionResponse:
     actual_duration = None
     if session.start_time and session.end_time:
@@ -18,21 +25,22 @@ def build_focus_session_response(session: Timelog) -> FocusSessionResponse:
         raw_duration_seconds = (session.end_time - session.start_time).total_seconds()
         raw_duration_minutes = int(raw_duration_seconds // 60)
         
-        print(f"🕒 Duration calculation for {session.type} session {session.session_id}:")
-        print(f"   Raw duration: {raw_duration_seconds}s ({raw_duration_minutes}min)")
-        print(f"   Planned duration: {session.planned_duration}min")
-        print(f"   Was paused at: {session.paused_at}")
+        logger.debug(
+            "Duration calculation for %s session %s: raw=%ss (%smin) planned=%smin paused_at=%s",
+            session.type, session.session_id, raw_duration_seconds, raw_duration_minutes,
+            session.planned_duration, session.paused_at,
+        )
         
         # For focus sessions, if duration is close to planned duration (within 1 minute),
         # use planned duration to avoid timing discrepancies from pauses
         if (session.type == "focus" and session.planned_duration and 
             abs(raw_duration_minutes - session.planned_duration) <= 1):
             actual_duration = session.planned_duration
-            print(f"   ✅ Using planned duration: {actual_duration}min (close to raw)")
+            logger.debug("Using planned duration: %smin (close to raw)", actual_duration)
         else:
             # For other cases, use calculated duration but cap it reasonably
             actual_duration = max(0, raw_duration_minutes)
-            print(f"   ⚠️ Using raw duration: {actual_duration}min")
+            logger.debug("Using raw duration: %smin", actual_duration)
 
     return FocusSessionResponse(
         session_id=session.session_id,
@@ -48,6 +56,73 @@ def build_focus_session_response(session: Timelog) -> FocusSessionResponse:
     )
 
 
+def _effective_duration_seconds(log: Timelog) -> float:
+    """Duration of a completed session, snapping focus sessions to their planned length.
+
+    Same rule as build_focus_session_response: a focus session within a minute of
+    its planned duration counts as exactly the planned duration.
+    """
+    raw_duration_seconds = (log.end_time - log.start_time).total_seconds()
+    raw_duration_minutes = int(raw_duration_seconds // 60)
+    if (log.type == "focus" and log.planned_duration and
+            abs(raw_duration_minutes - log.planned_duration) <= 1):
+        return log.planned_duration * 60
+    return raw_duration_seconds
+
+
+def _record_daily_rollup(db: Session, log: Timelog):
+    """Add a just-completed focus/break session to the user's daily rollup row.
+
+    Runs inside the caller's transaction (before commit) so the rollup and the
+    session end are persisted atomically.
+    """
+    if log.type not in ("focus", "break"):
+        return
+
+    start_time = log.start_time
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=timezone.utc)
+    day = start_time.astimezone(timezone.utc).date()
+
+    duration_seconds = int(_effective_duration_seconds(log))
+    focus_seconds = duration_seconds if log.type == "focus" else 0
+    break_seconds = duration_seconds if log.type == "break" else 0
+    session_count = 1 if log.type == "focus" else 0
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(DailyFocusRollup).values(
+            user_id=log.user_id,
+            date=day,
+            focus_seconds=focus_seconds,
+            break_seconds=break_seconds,
+            session_count=session_count,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyFocusRollup.user_id, DailyFocusRollup.date],
+            set_={
+                "focus_seconds": DailyFocusRollup.focus_seconds + stmt.excluded.focus_seconds,
+                "break_seconds": DailyFocusRollup.break_seconds + stmt.excluded.break_seconds,
+                "session_count": DailyFocusRollup.session_count + stmt.excluded.session_count,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    # Generic fallback for databases without ON CONFLICT support
+    rollup = db.get(DailyFocusRollup, (log.user_id, day))
+    if not rollup:
+        rollup = DailyFocusRollup(user_id=log.user_id, date=day, focus_seconds=0, break_seconds=0, session_count=0)
+        db.add(rollup)
+    rollup.focus_seconds += focus_seconds
+    rollup.break_seconds += break_seconds
+    rollup.session_count += session_count
+
+
 def start_session(db: Session, request: StartSessionRequest, type: str):
     # Check if user is active
     user = db.query(User).filter(User.id == request.user_id).first()
@@ -83,7 +158,7 @@ def start_session(db: Session, request: StartSessionRequest, type: str):
     elif start_time.tzinfo != timezone.utc:
         start_time = start_time.astimezone(timezone.utc)
     
-    print(f"🚀 Creating session with start_time: {start_time} (tzinfo: {start_time.tzinfo})")
+    logger.debug("Creating %s session with start_time: %s", type, start_time)
     
     new_session = Timelog(
         session_id=uuid.uuid4(),
@@ -98,60 +173,75 @@ def start_session(db: Session, request: StartSessionRequest, type: str):
     )
     db.add(new_session)
     db.commit()
+    session_cache.invalidate(request.user_id)
     db.refresh(new_session)
     return build_focus_session_response(new_session)
 
 
-def pause_session(db: Session, request: PauseSessionRequest):
-    # First, let's check if the session exists at all
-    session_any_status = db.query(Timelog).filter(
-        Timelog.session_id == request.session_id
-    ).first()
-    
-    if not session_any_status:
-        print(f"❌ Session {request.session_id} not found in database at all")
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    print(f"🔍 Found session {request.session_id} with status: {session_any_status.status}")
-    
-    # Handle case where session is already paused (protect against duplicate calls)
-    if session_any_status.status == "paused":
-        print(f"✅ Session {request.session_id} is already paused, returning current state")
-        return build_focus_session_response(session_any_status)
-    
-    # Now check for active session
-    session = db.query(Timelog).filter(
-        Timelog.session_id == request.session_id,
-        Timelog.status == "active"
-    ).first()
+def _elapsed_minutes(db: Session, now: datetime):
+    """SQL expression for whole minutes between a session's start_time and `now`"""
+    # start_time is stored as naive UTC
+    now = now.astimezone(timezone.utc).replace(tzinfo=None)
+    if db.get_bind().dialect.name == "sqlite":
+        return cast((func.julianday(now) - func.julianday(Timelog.start_time)) * 1440, Integer)
+    return cast(func.floor(extract("epoch", literal(now, DateTime) - Timelog.start_time) / 60), Integer)
+
 
+def _transition_conflict(db: Session, request, action: str, expected: str, target: str):
+    """
+    Explain why a conditional pause/resume UPDATE matched no row: one lookup, only
+    on this path. A session already in the target state is returned as is so that
+    duplicate calls stay harmless.
+    """
+    session = db.get(Timelog, request.session_id)
     if not session:
-        print(f"❌ Session {request.session_id} exists but status is '{session_any_status.status}', not 'active'")
-        raise HTTPException(status_code=404, detail=f"Session found but status is '{session_any_status.status}', not 'active'")
-    
-    print(f"✅ Pausing active session {request.session_id}")
-    now = datetime.now(timezone.utc)
+        logger.debug("%s: session %s not found", action, request.session_id)
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if session.status == target:
+        logger.debug("%s: session %s is already %s, returning current state", action, request.session_id, target)
+        return build_focus_session_response(session)
 
-    session.status = "paused"
-    session.paused_at = request.paused_at or now
+    if session.status == expected:
+        # Only the break check can stop a resume of a paused session
+        logger.debug("%s: session %s blocked by an active or paused break", action, request.session_id)
+        raise HTTPException(status_code=400, detail="Cannot resume focus session while a break session is active or paused. End/stop the break first.")
+
+    logger.debug("%s: session %s has status %r, not %r", action, request.session_id, session.status, expected)
+    raise HTTPException(status_code=404, detail=f"Session found but status is '{session.status}', not '{expected}'")
+
+
+def pause_session(db: Session, request: PauseSessionRequest):
+    # One conditional UPDATE ... RETURNING; only a miss costs a second lookup
+    now = datetime.now(timezone.utc)
 
-    # Remaining time logic
     if request.remaining_time is not None:
-        session.remaining_time = request.remaining_time
-    elif session.planned_duration:
-        # Fix timezone issue: handle naive start_time
-        if session.start_time.tzinfo is None:
-            # Convert naive datetime to UTC (assuming it was already stored in UTC)
-            start_time_utc = session.start_time.replace(tzinfo=timezone.utc)
-        else:
-            start_time_utc = session.start_time
-            
-        elapsed = int((now - start_time_utc).total_seconds() // 60)
-        session.remaining_time = max(session.planned_duration - elapsed, 0)
-        
+        remaining_time = request.remaining_time
+    else:
+        # Recompute from the planned duration; sessions without one keep their value
+        remaining = Timelog.planned_duration - _elapsed_minutes(db, now)
+        remaining_time = case(
+            (or_(Timelog.planned_duration.is_(None), Timelog.planned_duration == 0), Timelog.remaining_time),
+            (remaining > 0, remaining),
+            else_=0,
+        )
+
+    session = db.scalars(
+        update(Timelog)
+        .where(Timelog.session_id == request.session_id, Timelog.status == "active")
+        .values(status="paused", paused_at=request.paused_at or now, remaining_time=remaining_time)
+        .returning(Timelog)
+        .execution_options(synchronize_session=False)
+    ).one_or_none()
+
+    if session is None:
+        return _transition_conflict(db, request, "Pause", expected="active", target="paused")
+
+    # Build before committing so the commit does not expire the row and force a reload
+    response = build_focus_session_response(session)
     db.commit()
-    db.refresh(session)
-    return build_focus_session_response(session)
+    session_cache.invalidate(response.user_id)
+    return response
 
 
 def end_session(db: Session, request: EndSessionRequest, type: str):
@@ -161,13 +251,9 @@ def end_session(db: Session, request: EndSessionRequest, type: str):
         Timelog.type == type
     ).order_by(Timelog.start_time.desc()).first()
     if not session:
-        print(f"❌ No active {type} session found with session_id: {request.session_id}")
+        logger.debug("End: no active %s session found with session_id %s", type, request.session_id)
         raise HTTPException(status_code=404, detail="No active session found to end")
     
-    print(f"🎯 Ending {type} session for user {session.user_id}")
-    print(f"   Session ID: {session.session_id}")
-    print(f"   Type: {session.type}")
-    
     now = datetime.now(timezone.utc)
     
     # Use provided end_time or current time, ensure it's timezone-aware UTC
@@ -180,29 +266,26 @@ def end_session(db: Session, request: EndSessionRequest, type: str):
     else:
         end_time = now
     
-    # Debug logging
-    print(f"🔍 Backend end_session debug:")
-    print(f"  Original start_time: {session.start_time} (tzinfo: {session.start_time.tzinfo})")
-    print(f"  Request end_time: {request.end_time}")
-    print(f"  Processed end_time: {end_time} (tzinfo: {end_time.tzinfo})")
+    logger.debug(
+        "End: %s session %s start_time=%s requested end_time=%s processed end_time=%s",
+        type, session.session_id, session.start_time, request.end_time, end_time,
+    )
     
     # Ensure start_time is also timezone-aware UTC (in case of old data)
     if session.start_time.tzinfo is None:
         # For naive datetimes, assume they were already stored in UTC
         session.start_time = session.start_time.replace(tzinfo=timezone.utc)
-        print(f"  Fixed start_time (converted to UTC): {session.start_time}")
         
     # Calculate duration to verify it's positive
     duration_seconds = (end_time - session.start_time).total_seconds()
-    print(f"  Duration check: {duration_seconds}s ({duration_seconds/60:.1f}min)")
     
     if duration_seconds < 0:
-        print(f"❌ ERROR: Negative duration detected!")
-        print(f"   Start: {session.start_time}")
-        print(f"   End:   {end_time}")
+        logger.warning(
+            "Negative duration for session %s (start=%s, end=%s); clamping end_time",
+            session.session_id, session.start_time, end_time,
+        )
         # Force end_time to be at least equal to start_time
         end_time = session.start_time + timedelta(seconds=1)
-        print(f"   Fixed end_time: {end_time}")
     
     session.end_time = end_time
 
@@ -210,7 +293,6 @@ def end_session(db: Session, request: EndSessionRequest, type: str):
     if session.start_time and session.end_time:
         elapsed_minutes = int((session.end_time - session.start_time).total_seconds() // 60)
         # Note: actual_duration column doesn't exist in DB yet, so we don't store it
-        print(f"  Calculated duration: {elapsed_minutes} minutes")
         
         # Determine status based on planned vs actual duration
         if session.planned_duration and elapsed_minutes < session.planned_duration:
@@ -220,168 +302,129 @@ def end_session(db: Session, request: EndSessionRequest, type: str):
     else:
         session.status = "completed"
 
+    _record_daily_rollup(db, session)
     db.commit()
     db.refresh(session)
+    session_cache.invalidate(session.user_id)
     
-    # Debug the final result
-    print(f"  Final start_time: {session.start_time}")
-    print(f"  Final end_time: {session.end_time}")
-    print(f"  Final status: {session.status}")
-    print(f"  Final type: {session.type}")
-    print(f"✅ Successfully saved {type} session to database")
+    logger.debug(
+        "Ended %s session %s: start=%s end=%s status=%s",
+        type, session.session_id, session.start_time, session.end_time, session.status,
+    )
     # Note: actual_duration is calculated in build_focus_session_response, not stored in DB
     
     return build_focus_session_response(session)
 
 
 def resume_session(db: Session, request: ResumeSessionRequest):
-    # First, let's check if the session exists at all
-    session_any_status = db.query(Timelog).filter(
-        Timelog.session_id == request.session_id
-    ).first()
-    
-    if not session_any_status:
-        print(f"❌ Resume: Session {request.session_id} not found in database at all")
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    print(f"🔍 Resume: Found session {request.session_id} with status: {session_any_status.status}")
-    
-    # Handle case where session is already active (protect against duplicate calls)
-    if session_any_status.status == "active":
-        print(f"✅ Session {request.session_id} is already active, returning current state")
-        return build_focus_session_response(session_any_status)
-    
-    session = db.query(Timelog).filter(
-        Timelog.session_id == request.session_id,
-        Timelog.status == "paused"
-    ).first()
-    if not session:
-        print(f"❌ Resume: Session {request.session_id} exists but status is '{session_any_status.status}', not 'paused'")
-        raise HTTPException(status_code=404, detail=f"Session found but status is '{session_any_status.status}', not 'paused'")
-    
-    print(f"✅ Resuming paused session {request.session_id}")
-    
-    # If resuming a focus session, make sure no break session is active or paused
-    if session.type == "focus":
-        from datetime import datetime, timezone, timedelta
-        
-        # First check for truly active/recent break sessions (within last 2 hours)
-        two_hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
-        
-        conflicting_break = db.query(Timelog).filter(
-            Timelog.user_id == session.user_id,
-            Timelog.type == "break",
-            Timelog.status.in_(["active", "paused"]),
-            Timelog.end_time.is_(None),  # Only consider sessions that haven't ended
-            Timelog.start_time >= two_hours_ago  # Only recent sessions (not stale)
-        ).first()
-        
-        # Debug: List all break sessions for this user
-        all_breaks = db.query(Timelog).filter(
-            Timelog.user_id == session.user_id,
-            Timelog.type == "break"
-        ).all()
-        print(f"🔍 Debug: All break sessions for user {session.user_id}:")
-        for br in all_breaks:
-            print(f"  - Session {br.session_id}: status={br.status}, end_time={br.end_time}")
-        
-        if conflicting_break:
-            print(f"❌ Found conflicting break session {conflicting_break.session_id} with status {conflicting_break.status}")
-            raise HTTPException(status_code=400, detail="Cannot resume focus session while a break session is active or paused. End/stop the break first.")
-        else:
-            print(f"✅ No conflicting break sessions found (checked for recent sessions within 2 hours)")
-        
-        # Resume the session
-    session.status = "active"
-
+    # One conditional UPDATE ... RETURNING; only a miss costs a second lookup
+    values = {"status": "active"}
     if request.remaining_time is not None:
-        session.remaining_time = request.remaining_time
+        values["remaining_time"] = request.remaining_time
+
+    # A focus session may not resume while a recent break (last 2 hours) is still open
+    two_hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
+    open_break = aliased(Timelog)
+    break_in_progress = exists().where(
+        open_break.user_id == Timelog.user_id,
+        open_break.type == "break",
+        open_break.status.in_(["active", "paused"]),
+        open_break.end_time.is_(None),
+        open_break.start_time >= two_hours_ago
+    )
+
+    session = db.scalars(
+        update(Timelog)
+        .where(
+            Timelog.session_id == request.session_id,
+            Timelog.status == "paused",
+            or_(Timelog.type != "focus", Timelog.type.is_(None), ~break_in_progress)
+        )
+        .values(**values)
+        .returning(Timelog)
+        .execution_options(synchronize_session=False)
+    ).one_or_none()
+
+    if session is None:
+        return _transition_conflict(db, request, "Resume", expected="paused", target="active")
 
+    # Build before committing so the commit does not expire the row and force a reload
+    response = build_focus_session_response(session)
     db.commit()
-    db.refresh(session)
-    return build_focus_session_response(session)
+    session_cache.invalidate(response.user_id)
+    return response
 
 
 def list_time_logs(db: Session, user_id):
     return db.query(Timelog).filter(Timelog.user_id == user_id).all()
 
 
-def get_daily_summary(db: Session, user_id):
-    from sqlalchemy import func, and_
-    from app.models.timelog import Timelog
-    from datetime import datetime, timezone, timedelta
-
-    # Get today's date in UTC
-    now_utc = datetime.now(timezone.utc)
-    today = now_utc.date()
-    today_start = datetime.combine(today, datetime.min.time(), tzinfo=timezone.utc)
-    today_end = today_start + timedelta(days=1)
-    
-    # Only get completed sessions (has end_time) from today
-    logs = db.query(Timelog).filter(
-        and_(
-            Timelog.user_id == user_id,
-            Timelog.start_time >= today_start,
-            Timelog.start_time < today_end,
-            Timelog.end_time.isnot(None)  # Only completed sessions
-        )
-    ).all()
-
-    print(f"📊 Daily summary for user {user_id}: Found {len(logs)} completed sessions today")
-    print(f"🕐 Date range: {today_start} to {today_end}")
-    for log in logs:
-        print(f"  📝 Session type: '{log.type}', Duration: {(log.end_time - log.start_time).total_seconds()}s, Start: {log.start_time}, End: {log.end_time}")
-
-    total_focus_sessions = 0
-    total_focus_time = 0
-    total_break_time = 0
-    focus_sessions = []
+def _daily_summary_from_rollup(today, rollup):
+    if not rollup:
+        return {
+            "date": today,
+            "total_focus_sessions": 0,
+            "total_focus_time": 0,
+            "total_break_time": 0,
+        }
 
-    for log in logs:
-        # Calculate duration in seconds using the same logic as build_focus_session_response
-        raw_duration_seconds = (log.end_time - log.start_time).total_seconds()
-        raw_duration_minutes = int(raw_duration_seconds // 60)
-        
-        # For focus sessions, use planned duration if close to actual (within 1 minute)
-        if (log.type == "focus" and log.planned_duration and 
-            abs(raw_duration_minutes - log.planned_duration) <= 1):
-            duration_seconds = log.planned_duration * 60  # Convert back to seconds for consistency
-            duration_minutes = log.planned_duration
-        else:
-            duration_seconds = raw_duration_seconds
-            duration_minutes = raw_duration_minutes
-        
-        print(f"  Session: {log.type}, Duration: {duration_seconds}s ({duration_minutes}min)")
-
-        if log.type == "focus":
-            total_focus_sessions += 1
-            total_focus_time += duration_seconds
-            # build session response for each focus log
-            focus_sessions.append({
-                "start_time": log.start_time,
-                "end_time": log.end_time,
-                "actual_duration": duration_seconds,
-            })
-        elif log.type == "break":
-            total_break_time += duration_seconds
-
-    print(f"  📈 Summary: {total_focus_sessions} focus sessions, {total_focus_time}s focus, {total_break_time}s break")
-    
     return {
         "date": today,
-        "total_focus_sessions": total_focus_sessions,
-        "total_focus_time": int(total_focus_time),
-        "total_break_time": int(total_break_time),
+        "total_focus_sessions": rollup.session_count,
+        "total_focus_time": rollup.focus_seconds,
+        "total_break_time": rollup.break_seconds,
         # "focus_sessions": []
     }
 
 
-def get_current_session(db: Session, user_id):
-    return db.query(Timelog).filter(
+def get_daily_summary(db: Session, user_id):
+    """Today's (UTC) focus/break totals, read from the daily_focus_rollups row"""
+    today = datetime.now(timezone.utc).date()
+    return _daily_summary_from_rollup(today, db.get(DailyFocusRollup, (user_id, today)))
+
+
+async def get_daily_summary_async(db: AsyncSession, user_id):
+    """Async variant of get_daily_summary for the async read routes"""
+    today = datetime.now(timezone.utc).date()
+    return _daily_summary_from_rollup(today, await db.get(DailyFocusRollup, (user_id, today)))
+
+
+def _current_session_query(user_id, type: str | None = None):
+    query = select(Timelog).where(
         Timelog.user_id == user_id,
-        Timelog.end_time == None 
-            
-    ).order_by(Timelog.start_time.desc()).first()
+        Timelog.end_time == None
+    )
+    if type:
+        query = query.where(Timelog.type == type)
+    return query.order_by(Timelog.start_time.desc()).limit(1)
+
+
+def get_current_session(db: Session, user_id):
+    return db.execute(_current_session_query(user_id)).scalars().first()
+
+
+async def get_current_session_async(db: AsyncSession, user_id):
+    result = await db.execute(_current_session_query(user_id))
+    return result.scalars().first()
+
+
+async def get_current_session_response_async(db: AsyncSession, user_id) -> FocusSessionResponse | None:
+    """Current-session response for the timer widget, served from session_cache when possible"""
+    async def load():
+        session = await get_current_session_async(db, user_id)
+        return build_focus_session_response(session) if session else None
+
+    return await session_cache.get_or_load(user_id, CURRENT, load)
+
+
+def get_current_work_session(db: Session, user_id):
+    """Open work (clock-in) session for the dashboard widget"""
+    return db.execute(_current_session_query(user_id, type="work")).scalars().first()
+
+
+async def get_current_work_session_async(db: AsyncSession, user_id):
+    result = await db.execute(_current_session_query(user_id, type="work"))
+    return result.scalars().first()
 
 def get_last_session(db: Session, user_id):
     """Get the most recent session (completed or active) for display purposes"""
@@ -396,47 +439,85 @@ def get_focus_time(db: Session, user_id):
     return summary["total_focus_time"] 
 
 
-def clock_in(db: Session, user_id:int):
-    log = Timelog(
-        user_id=user_id,
-        type="work",
-        start_time=datetime.now(timezone.utc),
-        status="active"  # Ensure work sessions have proper status
-    )
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
-
-def clock_out(db: Session, user_id:int):
-    log = db.query(Timelog).filter(
-        Timelog.user_id == user_id,
-        Timelog.type == "work",
-        Timelog.end_time == None
-    ).first()
-
-    if not log:
-        raise Exception("No active session found.")
-    
-    log.end_time = datetime.now(timezone.utc)
-    log.status = "completed"  # Set proper status when ending session
-    db.commit()
-    db.refresh(log)
-    return log
+async def get_focus_time_async(db: AsyncSession, user_id):
+    summary = await get_daily_summary_async(db, user_id)
+    return summary["total_focus_time"]
+
+
+async def apply_clock_events_async(db: AsyncSession, clock_ins, clock_outs) -> tuple[dict, dict]:
+    """Clock out and clock in many users in one transaction (see clock_batcher).
+
+    Returns ({user_id: work session} for clock-ins, {user_id: closed work session} for
+    clock-outs); a user missing from the second dict had no open work session.
+    Clocking in while a work session is open returns that session instead of opening
+    a second one, so a repeated clock-in is idempotent.
+    """
+    # The columns are naive UTC; asyncpg rejects aware datetimes for them
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    clocked_out = {}
+    if clock_outs:
+        closed = await db.scalars(
+            update(Timelog)
+            .where(
+                Timelog.user_id.in_(clock_outs),
+                Timelog.type == "work",
+                Timelog.end_time.is_(None)
+            )
+            .values(end_time=now, status="completed")
+            .returning(Timelog)
+            .execution_options(synchronize_session=False)
+        )
+        for log in closed:
+            # Legacy duplicates are all closed; report the latest one
+            latest = clocked_out.get(log.user_id)
+            if latest is None or log.start_time > latest.start_time:
+                clocked_out[log.user_id] = log
+
+    clocked_in = {}
+    opened = []
+    if clock_ins:
+        open_logs = await db.scalars(
+            select(Timelog)
+            .where(
+                Timelog.user_id.in_(clock_ins),
+                Timelog.type == "work",
+                Timelog.end_time.is_(None)
+            )
+            .order_by(Timelog.start_time)
+        )
+        for log in open_logs:
+            clocked_in[log.user_id] = log
+        new_logs = [
+            {"session_id": uuid.uuid4(), "user_id": user_id, "type": "work", "start_time": now, "status": "active"}
+            for user_id in clock_ins if user_id not in clocked_in
+        ]
+        if new_logs:
+            # One multi-row INSERT for the whole batch
+            for log in await db.scalars(insert(Timelog).returning(Timelog), new_logs):
+                clocked_in[log.user_id] = log
+                opened.append(log.user_id)
+
+    await db.commit()
+    # Only users whose open work session changed
+    session_cache.invalidate(*clocked_out, *opened)
+    return clocked_in, clocked_out
 
 
 def clear_all_sessions(db: Session, user_id):
     """Clear all timetracker sessions for a user - for clean slate"""
-    print(f"🧹 Clearing all timetracker sessions for user {user_id}")
-    
     # Delete all focus/break sessions (timetracker related)
     deleted_count = db.query(Timelog).filter(
         Timelog.user_id == user_id,
         Timelog.type.in_(["focus", "break"])  # Only clear timetracker sessions, not work sessions
     ).delete(synchronize_session=False)
+
+    db.query(DailyFocusRollup).filter(
+        DailyFocusRollup.user_id == user_id
+    ).delete(synchronize_session=False)
     
     db.commit()
-    print(f"✅ Cleared {deleted_count} timetracker sessions")
+    session_cache.invalidate(user_id)
+    logger.info("Cleared %s timetracker sessions for user %s", deleted_count, user_id)
     return {"message": f"Cleared {deleted_count} sessions", "cleared_count": deleted_count}
 
 
@@ -444,8 +525,6 @@ def clear_today_sessions(db: Session, user_id):
     """Clear only today's timetracker sessions for a fresh start"""
     from datetime import datetime, timezone, timedelta
     
-    print(f"🧹 Clearing today's timetracker sessions for user {user_id}")
-    
     # Get today's date range in UTC
     now_utc = datetime.now(timezone.utc)
     today = now_utc.date()
@@ -459,8 +538,14 @@ def clear_today_sessions(db: Session, user_id):
         Timelog.start_time >= today_start,
         Timelog.start_time < today_end
     ).delete(synchronize_session=False)
+
+    db.query(DailyFocusRollup).filter(
+        DailyFocusRollup.user_id == user_id,
+        DailyFocusRollup.date == today
+    ).delete(synchronize_session=False)
     
     db.commit()
-    print(f"✅ Cleared {deleted_count} today's timetracker sessions")
+    session_cache.invalidate(user_id)
+    logger.info("Cleared %s of today's timetracker sessions for user %s", deleted_count, user_id)
     return {"message": f"Cleared {deleted_count} today's sessions", "cleared_count": deleted_count}
 
@@ -3,6 +3,7 @@ from app.models.user import User
 from app.schemas.user import UserCreate
 from app.core.security import hash_password, verify_password
 from app.core.config import settings
+from app.core.user_cache import user_cache
 from app.services.emailservice import email_service
 import uuid
 import random
@@ -174,6 +175,7 @@ def verify_email_token(db: Session, token: str) -> bool:
         user.is_verified = True  # type: ignore
         user.verification_token = None  # type: ignore
         db.commit()
+        user_cache.invalidate(user.id)
         logger.info(f"Email verified successfully for user {user.email}")
         return True
     else:
@@ -218,6 +220,7 @@ def verify_otp(db: Session, email: str, otp: str) -> bool:
         user.otp = None  # type: ignore  
         user.otp_expires_at = None  # type: ignore
         db.commit()
+        user_cache.invalidate(user.id)
         logger.info(f"OTP verified successfully for {user.email}")
         return True
     return False
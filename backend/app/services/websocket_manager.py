@@ -1,35 +1,98 @@
-from typing import Dict, Set, List
+from typing import Callable, Dict, Set, List, Optional, Tuple
+import asyncio
 import json
 import logging
+import time
 from fastapi import WebSocket
-from uuid import UUID
+from uuid import UUID, uuid4
+
+from app.core.config import settings
+from app.services.ws_backplane import Backplane, create_backplane
 
 logger = logging.getLogger(__name__)
 
+# Close code for connections dropped by the slow-consumer policy ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Close code for connections that stopped sending heartbeats
+HEARTBEAT_TIMEOUT_CLOSE_CODE = 4008
+
+
+class _Connection:
+    """One socket with its bounded outbound queue and the writer task draining it"""
+    __slots__ = ("websocket", "room_id", "user_id", "queue", "writer", "closing", "last_seen")
+
+    def __init__(self, websocket: WebSocket, room_id: str, user_id: str, queue_size: int):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        # Set once the slow-consumer policy decided to drop it
+        self.closing = False
+        # Monotonic time of the last message received from the client
+        self.last_seen = time.monotonic()
+
+
 class WebSocketManager:
-    def __init__(self):
+    """Room WebSocket registry with per-connection send queues.
+
+    Broadcasting only enqueues the serialized message on each connection, so fan-out
+    never waits on a socket; every connection has its own writer task. When a queue
+    is full the slow-consumer policy either drops the oldest queued message or
+    disconnects that client, leaving everyone else in the room unaffected.
+
+    Each manager is one node of the backplane: room broadcasts and direct user
+    messages are delivered to local sockets and published for the other workers.
+    """
+
+    def __init__(self, queue_size: int = None, slow_consumer_policy: str = None, backplane: Backplane = None):
+        self.queue_size = queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.slow_consumer_policy = slow_consumer_policy or settings.WS_SLOW_CONSUMER_POLICY
+        self.backplane = backplane or create_backplane()
+        self.node_id = uuid4().hex
         # Track active connections by room
         self.room_connections: Dict[str, Set[WebSocket]] = {}
-        # Track user to websocket mapping
-        self.user_connections: Dict[str, WebSocket] = {}
-        # Track websocket to user mapping
-        self.connection_users: Dict[WebSocket, str] = {}
+        # Every socket of a user in a room (several tabs or devices); keyed by (user_id, room_id)
+        self.user_connections: Dict[Tuple[str, str], Set[WebSocket]] = {}
+        # Reverse lookup: websocket to its room, user, queue and writer
+        self.connections: Dict[WebSocket, _Connection] = {}
+        self.dropped_messages = 0
+        self.slow_consumer_disconnects = 0
+        self.backplane_received = 0
+        self._tasks: Set[asyncio.Task] = set()
+        # (event types, listener) pairs told about room events published by other nodes
+        self._room_event_listeners: List[Tuple[Set[str], Callable[[str, str, dict], None]]] = []
+
+    async def start(self):
+        """Join the backplane (application startup)"""
+        await self.backplane.start(self.node_id, self._on_backplane_message)
+        logger.info(f"WebSocket node {self.node_id} started with {self.backplane.name} backplane")
+
+    async def stop(self):
+        await self.backplane.stop(self.node_id)
 
     async def connect(self, websocket: WebSocket, room_id: str, user_id: str):
-        """Connect a user to a room's WebSocket"""
+        """Connect a user to a room's WebSocket; only their first socket in the room announces user-joined"""
         await websocket.accept()
-        
+
+        connection = _Connection(websocket, room_id, user_id, self.queue_size)
+        connection.writer = asyncio.create_task(self._writer(connection))
+
         # Add to room connections
         if room_id not in self.room_connections:
             self.room_connections[room_id] = set()
         self.room_connections[room_id].add(websocket)
-        
+
         # Track user mapping
-        self.user_connections[user_id] = websocket
-        self.connection_users[websocket] = user_id
-        
-        logger.info(f"User {user_id} connected to room {room_id}")
-        
+        sockets = self.user_connections.setdefault((user_id, room_id), set())
+        sockets.add(websocket)
+        self.connections[websocket] = connection
+
+        logger.info(f"User {user_id} connected to room {room_id} ({len(sockets)} connection(s))")
+        if len(sockets) > 1:
+            # Another tab of someone already present
+            return
+
         # Notify others in room about new user
         await self.broadcast_to_room(room_id, {
             "type": "user-joined",
@@ -39,68 +102,203 @@ class WebSocketManager:
         }, exclude_user=user_id)
 
     async def disconnect(self, websocket: WebSocket):
-        """Disconnect a user from their room"""
-        if websocket in self.connection_users:
-            user_id = self.connection_users[websocket]
-            
-            # Find and remove from room
-            room_id = None
-            for rid, connections in self.room_connections.items():
-                if websocket in connections:
-                    connections.remove(websocket)
-                    room_id = rid
-                    break
-            
-            # Clean up mappings
-            del self.connection_users[websocket]
-            if user_id in self.user_connections:
-                del self.user_connections[user_id]
-            
-            logger.info(f"User {user_id} disconnected from room {room_id}")
-            
-            # Notify others about user leaving
-            if room_id:
-                await self.broadcast_to_room(room_id, {
-                    "type": "user-left",
-                    "data": {"userId": user_id},
-                    "from": user_id,
-                    "roomId": room_id
-                }, exclude_user=user_id)
+        """Disconnect one socket; user-left is announced when the user's last socket in the room closes"""
+        connection = self.connections.pop(websocket, None)
+        if connection is None:
+            return
+
+        user_id, room_id = connection.user_id, connection.room_id
+        room = self.room_connections.get(room_id)
+        if room is not None:
+            room.discard(websocket)
+            if not room:
+                del self.room_connections[room_id]
+
+        # Clean up mappings
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+        sockets = self.user_connections.get((user_id, room_id))
+        if sockets is not None:
+            sockets.discard(websocket)
+            if sockets:
+                logger.info(f"User {user_id} closed one of {len(sockets) + 1} connections to room {room_id}")
+                return
+            del self.user_connections[(user_id, room_id)]
+
+        logger.info(f"User {user_id} disconnected from room {room_id}")
+
+        # Notify others about user leaving
+        await self.broadcast_to_room(room_id, {
+            "type": "user-left",
+            "data": {"userId": user_id},
+            "from": user_id,
+            "roomId": room_id
+        }, exclude_user=user_id)
 
     async def broadcast_to_room(self, room_id: str, message: dict, exclude_user: str = None):
-        """Broadcast message to all users in a room except excluded user"""
+        """Broadcast message to all users in a room except excluded user, on every node"""
+        message_json = json.dumps(message)
+        self._deliver_to_room(room_id, message_json, exclude_user)
+        await self.backplane.publish(self.node_id, {
+            "kind": "room", "roomId": room_id, "exclude": exclude_user, "type": message.get("type"),
+            "message": message_json
+        })
+
+    def _deliver_to_room(self, room_id: str, message_json: str, exclude_user: str = None) -> None:
         if room_id not in self.room_connections:
             return
-        
-        message_json = json.dumps(message)
-        disconnected = []
-        
-        for websocket in self.room_connections[room_id].copy():
-            user_id = self.connection_users.get(websocket)
-            
+
+        for websocket in list(self.room_connections[room_id]):
+            connection = self.connections.get(websocket)
             # Skip excluded user
-            if exclude_user and user_id == exclude_user:
+            if connection is None or (exclude_user and connection.user_id == exclude_user):
                 continue
-                
+            self._enqueue(connection, message_json)
+
+    async def publish_room_event(self, room_id: str, event_type: str, data: dict, from_user: str = None):
+        """Broadcast a typed room state change (chat, mic, speaking, emoji) once it is committed.
+
+        Uses the same envelope as the signaling messages; the acting user is skipped
+        because their REST response already carries the change.
+        """
+        await self.broadcast_to_room(room_id, {
+            "type": event_type,
+            "data": data,
+            "from": from_user,
+            "roomId": room_id
+        }, exclude_user=from_user)
+
+    async def send_to_user(self, user_id: str, message: dict, room_id: str):
+        """Send message to every socket of a user in a room, whichever nodes hold them"""
+        message_json = json.dumps(message)
+        self._deliver_to_user(user_id, room_id, message_json)
+        await self.backplane.publish(self.node_id, {
+            "kind": "user", "userId": user_id, "roomId": room_id, "message": message_json
+        })
+
+    def _deliver_to_user(self, user_id: str, room_id: str, message_json: str) -> None:
+        for websocket in list(self.user_connections.get((user_id, room_id), ())):
+            connection = self.connections.get(websocket)
+            if connection is not None:
+                self._enqueue(connection, message_json)
+
+    async def _on_backplane_message(self, envelope: dict) -> None:
+        """Deliver a message published by another node to the sockets held here"""
+        self.backplane_received += 1
+        kind = envelope.get("kind")
+        if kind == "room":
+            self._deliver_to_room(envelope["roomId"], envelope["message"], envelope.get("exclude"))
+            self._notify_room_event(envelope)
+        elif kind == "user":
+            self._deliver_to_user(envelope["userId"], envelope["roomId"], envelope["message"])
+        else:
+            logger.warning(f"Unknown backplane message kind: {kind}")
+
+    def add_room_event_listener(self, event_types: Set[str], listener: Callable[[str, str, dict], None]) -> None:
+        """Call listener(room_id, event_type, data) for these room events when another node publishes them.
+
+        Lets per-worker state (e.g. room presence) follow changes made through other workers.
+        """
+        self._room_event_listeners.append((set(event_types), listener))
+
+    def _notify_room_event(self, envelope: dict) -> None:
+        event_type = envelope.get("type")
+        listeners = [listener for types, listener in self._room_event_listeners if event_type in types]
+        if not listeners:
+            return
+        data = json.loads(envelope["message"]).get("data") or {}
+        for listener in listeners:
             try:
-                await websocket.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Failed to send message to user {user_id}: {e}")
-                disconnected.append(websocket)
-        
-        # Clean up disconnected websockets
-        for ws in disconnected:
-            await self.disconnect(ws)
-
-    async def send_to_user(self, user_id: str, message: dict):
-        """Send message to specific user"""
-        if user_id in self.user_connections:
-            websocket = self.user_connections[user_id]
+                listener(envelope["roomId"], event_type, data)
+            except Exception:
+                logger.exception("Room event listener failed for %s", event_type)
+
+    async def send_to_connection(self, websocket: WebSocket, message: dict):
+        """Queue a message for one socket, in order with its broadcasts (e.g. history backfill)"""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            self._enqueue(connection, json.dumps(message))
+
+    def touch(self, websocket: WebSocket) -> None:
+        """Record that the client is alive (any received message counts as a heartbeat)"""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.last_seen = time.monotonic()
+
+    def live_participants(self) -> Set[Tuple[str, str]]:
+        """(room_id, user_id) of every participant with at least one socket on this node"""
+        return {(room_id, user_id) for user_id, room_id in self.user_connections}
+
+    async def close_silent_connections(self, timeout: float) -> int:
+        """Close sockets that have not sent anything (heartbeats included) for `timeout` seconds"""
+        cutoff = time.monotonic() - timeout
+        silent = [c for c in self.connections.values() if c.last_seen < cutoff and not c.closing]
+        for connection in silent:
+            logger.warning(f"Closing silent WebSocket of user {connection.user_id} in room {connection.room_id}")
+            connection.closing = True
+            await self.disconnect(connection.websocket)
+            try:
+                await connection.websocket.close(code=HEARTBEAT_TIMEOUT_CLOSE_CODE, reason="Heartbeat timeout")
+            except Exception:
+                pass
+        return len(silent)
+
+    def _enqueue(self, connection: _Connection, message_json: str) -> None:
+        if connection.closing:
+            return
+        try:
+            connection.queue.put_nowait(message_json)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.slow_consumer_policy == "disconnect":
+            connection.closing = True
+            self.slow_consumer_disconnects += 1
+            logger.warning(f"Disconnecting slow consumer {connection.user_id} in room {connection.room_id}")
+            task = asyncio.create_task(self._drop_slow_consumer(connection))
+            # Keep a reference so the task is not garbage collected before it runs
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+
+        # drop-oldest: the newest state matters more than a stale backlog
+        connection.queue.get_nowait()
+        connection.queue.put_nowait(message_json)
+        self.dropped_messages += 1
+
+    async def _drop_slow_consumer(self, connection: _Connection) -> None:
+        await self.disconnect(connection.websocket)
+        try:
+            await connection.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Too slow")
+        except Exception:
+            pass
+
+    async def _writer(self, connection: _Connection) -> None:
+        """Drain one connection's queue; a failed send disconnects only this socket"""
+        while True:
+            message_json = await connection.queue.get()
             try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Failed to send message to user {user_id}: {e}")
-                await self.disconnect(websocket)
+                await connection.websocket.send_text(message_json)
+            except Exception:
+                logger.exception("Failed to send message to user %s", connection.user_id)
+                await self.disconnect(connection.websocket)
+                return
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self.room_connections),
+            "connections": len(self.connections),
+            "room_users": len(self.user_connections),
+            "queued_messages": sum(c.queue.qsize() for c in self.connections.values()),
+            "queue_size": self.queue_size,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "dropped_messages": self.dropped_messages,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "node_id": self.node_id,
+            "backplane": self.backplane.name,
+            "backplane_received": self.backplane_received,
+        }
 
-# Global WebSocket manager instance
+# Global WebSocket manager instance (one backplane node per worker process)
 websocket_manager = WebSocketManager()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# Receives envelopes published by other nodes
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class Backplane(ABC):
+    """Carries room broadcasts and direct user messages between WebSocket nodes.
+
+    A node delivers to its own sockets directly and publishes an envelope here; the
+    backplane hands that envelope to every *other* node's handler, which delivers it
+    to the sockets it holds. The current-session cache uses its own channel to
+    forward invalidations the same way.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def start(self, node_id: str, handler: Handler) -> None:
+        """Begin handing envelopes published by other nodes to `handler`"""
+
+    @abstractmethod
+    async def publish(self, node_id: str, envelope: dict) -> None:
+        """Send an envelope to every node except `node_id`"""
+
+    async def stop(self, node_id: str) -> None:
+        pass
+
+
+class InProcessBackplane(Backplane):
+    """Nodes living in the same process (a single worker, or several managers in tests/benchmarks)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {}
+
+    async def start(self, node_id: str, handler: Handler) -> None:
+        self._handlers[node_id] = handler
+
+    async def publish(self, node_id: str, envelope: dict) -> None:
+        for other_id, handler in list(self._handlers.items()):
+            if other_id == node_id:
+                continue
+            try:
+                await handler(envelope)
+            except Exception:
+                logger.exception("Backplane delivery to node %s failed", other_id)
+
+    async def stop(self, node_id: str) -> None:
+        self._handlers.pop(node_id, None)
+
+
+class RedisBackplane(Backplane):
+    """Redis pub/sub on one channel shared by every worker and container.
+
+    Envelopes carry the publishing node id so a node ignores its own messages. If Redis
+    goes away the listener keeps reconnecting; local delivery is unaffected meanwhile.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, channel: str):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("WS_BACKPLANE=redis requires the redis package")
+        self.url = url
+        self.channel = channel
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self.publish_errors = 0
+
+    async def start(self, node_id: str, handler: Handler) -> None:
+        self._redis = aioredis.from_url(self.url, decode_responses=True)
+        self._listener = asyncio.create_task(self._listen(node_id, handler))
+
+    async def publish(self, node_id: str, envelope: dict) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(self.channel, json.dumps({**envelope, "node": node_id}))
+        except Exception:
+            self.publish_errors += 1
+            logger.exception("Failed to publish to backplane channel %s", self.channel)
+
+    async def _listen(self, node_id: str, handler: Handler) -> None:
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                logger.info(f"Node {node_id} subscribed to WebSocket backplane channel {self.channel}")
+                async for raw in pubsub.listen():
+                    if raw.get("type") != "message":
+                        continue
+                    envelope = json.loads(raw["data"])
+                    if envelope.get("node") == node_id:
+                        continue
+                    try:
+                        await handler(envelope)
+                    except Exception:
+                        logger.exception("Failed to deliver backplane message")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Backplane subscription to %s lost, retrying", self.channel)
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def stop(self, node_id: str) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+def create_backplane(channel: str = None) -> Backplane:
+    """Backplane selected by WS_BACKPLANE (on WS_BACKPLANE_CHANNEL unless another channel is given)"""
+    if settings.WS_BACKPLANE == "redis":
+        return RedisBackplane(settings.WS_BACKPLANE_REDIS_URL, channel or settings.WS_BACKPLANE_CHANNEL)
+    return InProcessBackplane()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark for room WebSocket fan-out.
+
+Opens in-memory fake sockets for many rooms (15 participants x 500 rooms by
+default), makes some participants slow consumers, and broadcasts a burst of
+messages into every room concurrently. Compares the previous sequential
+broadcast (one awaited send_text per socket) with WebSocketManager's
+per-connection queues and writer tasks, reporting delivery latency for the
+healthy clients and how long the whole burst took to deliver.
+
+Usage:
+    python scripts/benchmark_websocket_fanout.py
+    python scripts/benchmark_websocket_fanout.py --rooms 100 --slow-per-room 3 --slow-delay 0.2
+    python scripts/benchmark_websocket_fanout.py --queue-size 8 --policy disconnect
+
+No database or network is used.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.websocket_manager import WebSocketManager
+
+
+class FakeWebSocket:
+    """Records per-message delivery latency; slow sockets take `delay` seconds per send"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.latencies: list[float] = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.closed:
+            raise RuntimeError("socket closed")
+        # Yield like a real socket write; slow clients block for longer
+        await asyncio.sleep(self.delay)
+        # sentAt is the last key of benchmark messages; avoid a full JSON parse per delivery
+        if text.endswith("}") and '"sentAt": ' in text:
+            sent_at = float(text[text.rindex('"sentAt": ') + 10:-1])
+            self.latencies.append(time.perf_counter() - sent_at)
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.closed = True
+
+
+class SequentialManager:
+    """The broadcast WebSocketManager used before per-connection queues"""
+
+    def __init__(self):
+        self.room_connections: dict[str, set] = {}
+        self.connection_users: dict = {}
+
+    async def connect(self, websocket, room_id: str, user_id: str):
+        await websocket.accept()
+        self.room_connections.setdefault(room_id, set()).add(websocket)
+        self.connection_users[websocket] = user_id
+
+    async def broadcast_to_room(self, room_id: str, message: dict, exclude_user: str = None):
+        message_json = json.dumps(message)
+        for websocket in self.room_connections[room_id].copy():
+            if exclude_user and self.connection_users.get(websocket) == exclude_user:
+                continue
+            await websocket.send_text(message_json)
+
+
+async def run(manager, args) -> dict:
+    sockets = {}
+    for room in range(args.rooms):
+        room_id = f"room-{room}"
+        for user in range(args.participants):
+            websocket = FakeWebSocket(args.slow_delay if user < args.slow_per_room else 0.0)
+            sockets[websocket] = user < args.slow_per_room
+            await manager.connect(websocket, room_id, f"{room_id}-user-{user}")
+
+    async def publisher(room_id: str):
+        for _ in range(args.messages):
+            await manager.broadcast_to_room(room_id, {
+                "type": "chat-message",
+                "data": {"text": "hello"},
+                "roomId": room_id,
+                "sentAt": time.perf_counter(),
+            })
+            await asyncio.sleep(args.interval)
+
+    # connect() announces user-joined; only measure the burst
+    await asyncio.sleep(0.1)
+    for websocket in sockets:
+        websocket.latencies.clear()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(publisher(f"room-{room}") for room in range(args.rooms)))
+    publish_seconds = time.perf_counter() - started
+
+    healthy = [ws for ws, slow in sockets.items() if not slow]
+    expected = len(healthy) * args.messages
+    # Wait for every healthy delivery, or until deliveries stop
+    delivered, stalled_since = 0, time.perf_counter()
+    while delivered < expected and time.perf_counter() - stalled_since < 1.0 + args.slow_delay:
+        await asyncio.sleep(0.01)
+        now_delivered = sum(len(ws.latencies) for ws in healthy)
+        if now_delivered != delivered:
+            delivered, stalled_since = now_delivered, time.perf_counter()
+    healthy_seconds = time.perf_counter() - started
+
+    # A tiny queue with the disconnect policy may evict every healthy socket
+    latencies = sorted(latency * 1000 for ws in healthy for latency in ws.latencies) or [0.0]
+    result = {
+        "publish_s": publish_seconds,
+        "healthy_done_s": healthy_seconds,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+        "max_ms": latencies[-1],
+        "delivered": f"{delivered}/{expected}",
+    }
+    if isinstance(manager, WebSocketManager):
+        result.update(dropped=manager.dropped_messages, disconnected=manager.slow_consumer_disconnects)
+        for websocket in list(manager.connections):
+            await manager.disconnect(websocket)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--participants", type=int, default=15, help="sockets per room")
+    parser.add_argument("--slow-per-room", type=int, default=1)
+    parser.add_argument("--slow-delay", type=float, default=0.2, help="seconds per send for slow sockets")
+    parser.add_argument("--messages", type=int, default=20, help="messages broadcast per room")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between messages per room")
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--policy", choices=("drop-oldest", "disconnect"), default="drop-oldest")
+    args = parser.parse_args()
+
+    print(f"🚀 {args.rooms} rooms x {args.participants} sockets, {args.slow_per_room} slow per room "
+          f"({args.slow_delay * 1000:.0f} ms/send), {args.messages} messages per room")
+    results = {}
+    print("   ... sequential broadcast")
+    results["sequential"] = asyncio.run(run(SequentialManager(), args))
+    print("   ... queued fan-out")
+    results["queued"] = asyncio.run(run(WebSocketManager(args.queue_size, args.policy), args))
+
+    print("\n📊 Summary (healthy clients)")
+    print(f"   {'manager':<11} {'publish s':>10} {'delivered s':>12} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} "
+          f"{'messages':>16}")
+    for name, r in results.items():
+        print(f"   {name:<11} {r['publish_s']:>10.2f} {r['healthy_done_s']:>12.2f} "
+              f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['max_ms']:>9.2f} {r['delivered']:>16}")
+    queued = results["queued"]
+    print(f"\n   queued: {queued['dropped']} messages dropped, {queued['disconnected']} slow consumers disconnected")
+
+
+if __name__ == "__main__":
+    main()
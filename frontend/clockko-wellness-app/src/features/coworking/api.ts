@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { RoomSummary, Room } from "../../types/typesGlobal";
+import type { RoomSummary, Room, Message } from "../../types/typesGlobal";
 // Temporarily comment out localStorage fallback for debugging
 // import { coworkingService } from "./coworkingService";
 
@@ -117,6 +117,32 @@ export async function fetchRoom(roomId: string): Promise<Room | null> {
   }
 }
 
+// Room chat history, oldest first. Pass the returned nextCursor as `before` to load older messages.
+export async function fetchRoomMessages(
+  roomId: string,
+  before?: string,
+  limit = 50
+): Promise<{ messages: Message[]; nextCursor: string | null }> {
+  try {
+    const response = await api.get(`/coworking/rooms/${roomId}/messages`, {
+      params: { limit, ...(before ? { before } : {}) }
+    });
+    return {
+      messages: response.data.map((m: any) => ({
+        id: m.id,
+        user: m.user,
+        avatar: m.avatar,
+        text: m.text,
+        time: m.time
+      })),
+      nextCursor: response.headers['x-next-cursor'] ?? null
+    };
+  } catch (error) {
+    console.error(`❌ Failed to fetch messages for room ${roomId}:`, error);
+    throw error;
+  }
+}
+
 export async function joinRoom(roomId: string): Promise<Room | null> {
   try {
     console.log(`🚪 Joining room ${roomId} via backend API...`);
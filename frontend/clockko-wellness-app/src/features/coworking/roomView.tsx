@@ -1,5 +1,5 @@
 import { useEffect, useState, useRef } from 'react'
-import { fetchRoom } from './api'
+import { fetchRoom, fetchRoomMessages } from './api'
 import { coworkingService } from './coworkingService'
 import type { Room, Message } from '../../types/typesGlobal'
 import { Skeleton } from '@/components/ui/skeleton'
@@ -195,12 +195,16 @@ useEffect(() => {
     // Load room data
     const loadRoom = async () => {
       try {
-        const roomData = await fetchRoom(roomId);
+        // Room details no longer embed the chat history; load it from the messages endpoint
+        const [roomData, history] = await Promise.all([
+          fetchRoom(roomId),
+          fetchRoomMessages(roomId)
+        ]);
         if (isMounted && roomData) {
           hasFetched.current = true;
           setRoom(roomData);
           setDisplayRoomName(roomData.name);
-          setMessages(Array.isArray(roomData.messages) ? roomData.messages : []);
+          setMessages(history.messages);
           setLoading(false);
         }
       } catch (error) {